@@ -2,17 +2,22 @@ import time
 import os
 import io
 import sys
+import uuid
+import queue
+import base64
+import shutil
 import smtplib
 import threading
 from datetime import datetime, timedelta
 import configparser
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:  # not Linux / not installed: use watchdog's Observer instead
+    INotify = None
+
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
@@ -64,83 +69,156 @@ else:
 script_basename = os.path.splitext(os.path.basename(sys.argv[0]))[0]
 LOG_FILE = os.path.join(base_path, f"{script_basename}.log")
 
-# Store new files in this list before sending
-new_files = []
-lock = threading.Lock()
+# Store new files in this queue before sending
+new_files = queue.SimpleQueue()
+
+# Raw bytes read per attachment chunk: a whole number of 57-byte groups so each
+# chunk base64-encodes to complete 76-char lines (RFC 2045) with no carry-over.
+ATTACH_CHUNK = 57 * 144
+
+# Seconds any single SMTP socket operation may block before the batch is abandoned
+SMTP_TIMEOUT = 60
+
+# Stream a multipart/mixed message straight onto the SMTP DATA channel so only
+# one chunk of each attachment is ever held in memory.
+def stream_email(server, files_to_send, subject, body):
+    boundary = f"===============zm_ai_{uuid.uuid4().hex}=="
+    sock = server.sock
+
+    code, resp = server.mail(EMAIL_SENDER)
+    if code != 250:
+        raise smtplib.SMTPSenderRefused(code, resp, EMAIL_SENDER)
+    code, resp = server.rcpt(EMAIL_RECEIVER)
+    if code not in (250, 251):
+        raise smtplib.SMTPRecipientsRefused({EMAIL_RECEIVER: (code, resp)})
+    server.putcmd("data")
+    code, resp = server.getreply()
+    if code != 354:
+        raise smtplib.SMTPDataError(code, resp)
+
+    # From here the connection is mid-DATA: on any error drop it rather than let
+    # SMTP.__exit__ send QUIT into a half-written body and wait for a reply
+    try:
+        # Headers + text part (base64 bodies never start a line with ".", so no dot-stuffing needed)
+        sock.sendall((
+            f"From: {EMAIL_SENDER}\r\n"
+            f"To: {EMAIL_RECEIVER}\r\n"
+            f"Subject: {subject}\r\n"
+            f"MIME-Version: 1.0\r\n"
+            f'Content-Type: multipart/mixed; boundary="{boundary}"\r\n'
+            f"\r\n"
+            f"--{boundary}\r\n"
+            f'Content-Type: text/plain; charset="utf-8"\r\n'
+            f"Content-Transfer-Encoding: base64\r\n"
+            f"\r\n"
+        ).encode("utf-8"))
+        sock.sendall(base64.encodebytes(body.encode("utf-8")).replace(b"\n", b"\r\n"))
+
+        # Attach each file, reusing one read buffer across all of them
+        buf = bytearray(ATTACH_CHUNK)
+        view = memoryview(buf)
+        for file_path in files_to_send:
+            file_name = os.path.basename(file_path)
+            try:
+                attachment = open(file_path, "rb")
+            except Exception as e:
+                printLog(f"❌ Error attaching {file_name}: {e}")
+                continue
+            with attachment:
+                sock.sendall((
+                    f"--{boundary}\r\n"
+                    f"Content-Type: application/octet-stream\r\n"
+                    f"MIME-Version: 1.0\r\n"
+                    f"Content-Transfer-Encoding: base64\r\n"
+                    f"Content-Disposition: attachment; filename={file_name}\r\n"
+                    f"\r\n"
+                ).encode("utf-8"))
+                while True:
+                    n = attachment.readinto(buf)
+                    if not n:
+                        break
+                    sock.sendall(base64.encodebytes(view[:n]).replace(b"\n", b"\r\n"))
+
+        sock.sendall(f"--{boundary}--\r\n.\r\n".encode("utf-8"))
+        code, resp = server.getreply()
+    except BaseException:
+        server.close()
+        raise
+    if code != 250:
+        raise smtplib.SMTPDataError(code, resp)
 
 # Function to send an email with multiple attachments
 def send_email():
-    global new_files
     while True:
-        time.sleep(int(BATCH_INTERVAL))  # Wait for the batch interval
+        time.sleep(BATCH_INTERVAL)  # Wait for the batch interval
 
-        with lock:
-            if not new_files:  # Skip if no new files
-                continue
-            files_to_send = new_files[:]
-            new_files.clear()  # Reset the list **only after copying**
+        # Drain everything queued since the last batch
+        files_to_send = []
+        try:
+            while True:
+                files_to_send.append(new_files.get_nowait())
+        except queue.Empty:
+            pass
+        if not files_to_send:  # Skip if no new files
+            continue
 
         subject = f"Batch File Update ({len(files_to_send)} files)"
         body = f"The following new files were created:\n\n" + "\n".join(os.path.basename(f) for f in files_to_send)
 
-        msg = MIMEMultipart()
-        msg['From'] = EMAIL_SENDER
-        msg['To'] = EMAIL_RECEIVER
-        msg['Subject'] = subject
-        msg.attach(MIMEText(body, 'plain'))
-
-        # Attach each file
-        for file_path in files_to_send:
-            file_name = os.path.basename(file_path)
-            try:
-                with open(file_path, "rb") as attachment:
-                    part = MIMEBase("application", "octet-stream")
-                    part.set_payload(attachment.read())
-                    encoders.encode_base64(part)
-                    part.add_header("Content-Disposition", f"attachment; filename={file_name}")
-                    msg.attach(part)
-            except Exception as e:
-                printLog(f"❌ Error attaching {file_name}: {e}")
-
         # Send the email
         try:
-            with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
+            with smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=SMTP_TIMEOUT) as server:
                 server.starttls()  # Secure the connection
                 server.login(EMAIL_SENDER, EMAIL_PASSWORD)
-                server.sendmail(EMAIL_SENDER, EMAIL_RECEIVER, msg.as_string())
+                stream_email(server, files_to_send, subject, body)
                 printLog(f"✅ Batch email sent with {len(files_to_send)} files")
         except Exception as e:
             printLog(f"❌ Error sending email: {e}")
 
-# Define event handler for monitoring folder
+# Queue a newly written detection file if it belongs to a watched camera
+def queue_new_file(file_path):
+    file_name = os.path.basename(file_path)
+#    printLog(f"🔍 New file detected: {file_name}")
+    # Watchers only report files written after they started, so no creation-time check
+    # (and no stat()) is needed; just match any CAMID prefix
+    if file_name.startswith(CAMID_PREFIXES):
+        new_files.put(file_path)
+        printLog(f"🆕 File added to batch: {file_name}")
+
+# Define event handler for monitoring folder (watchdog fallback)
 class WatcherHandler(FileSystemEventHandler):
-    def __init__(self, script_start_time):
-        self.script_start_time = script_start_time
-
     def on_created(self, event):
         if event.is_directory:
             return
-        file_path = event.src_path
-        file_name = os.path.basename(file_path)
-        file_creation_time = os.path.getctime(file_path)
-#        printLog(f"🔍 New file detected: {file_name}")
-        # Only add new files created after the script started that match any CAMID prefix
-        if file_creation_time >= self.script_start_time and any(file_name.startswith(prefix) for prefix in CAMID_LIST):
-            with lock:
-                new_files.append(file_path)
-            printLog(f"🆕 File added to batch: {file_name}")
+        queue_new_file(event.src_path)
+
+# Linux: one inotify fd that only reports completed writes/renames, drained in batches
+def watch_inotify():
+    inotify = INotify()
+    inotify.add_watch(ZM_AI_DETECTIONS_DIR, inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO)
+    while True:
+        for event in inotify.read(timeout=1000, read_delay=50):
+            if not event.name or event.mask & inotify_flags.ISDIR:
+                continue
+            queue_new_file(os.path.join(ZM_AI_DETECTIONS_DIR, event.name))
 
 # Start the observer and email sender thread
 def start_monitoring():
-    script_start_time = time.time()  # Capture script start time
-    event_handler = WatcherHandler(script_start_time)
-    observer = Observer()
-    observer.schedule(event_handler, ZM_AI_DETECTIONS_DIR, recursive=False)
-
     # Start the batch email sender thread
     email_thread = threading.Thread(target=send_email, daemon=True)
     email_thread.start()
 
+    if INotify is not None:
+        try:
+            watch_inotify()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    event_handler = WatcherHandler()
+    observer = Observer()
+    observer.schedule(event_handler, ZM_AI_DETECTIONS_DIR, recursive=False)
+
     # Start monitoring
     observer.start()
     try:
@@ -151,7 +229,66 @@ def start_monitoring():
 
     observer.join()
 
+# Log lines are appended through one handle; retention is applied by a periodic
+# compaction instead of re-reading and rewriting the whole file on every line.
+LOG_COMPACT_INTERVAL = 60  # seconds between retention sweeps of LOG_FILE
+log_handle = None
+log_last_compact = 0.0
+log_lock = threading.Lock()  # printLog is called from several threads
+
+def first_log_line_at(f, pos):
+    """Offset and timestamp of the first '[YYYY-mm-dd HH:MM:SS]' line starting at or after pos."""
+    if pos:
+        f.seek(pos - 1)
+        f.readline()  # finish the line that pos falls in (no-op if pos starts a line)
+    else:
+        f.seek(0)
+    while True:
+        offset = f.tell()
+        line = f.readline()
+        if not line:
+            return offset, None
+        if line.startswith(b"["):
+            try:
+                return offset, datetime.strptime(line[1:20].decode('ascii'), '%Y-%m-%d %H:%M:%S')
+            except ValueError:
+                pass
+
+def compact_log(now):
+    global log_handle
+    # Log lines are appended in time order, so bisect over byte offsets for the
+    # first line inside the retention window instead of parsing every line.
+    cutoff = now - timedelta(days=LOG_RETENTION_DAYS)
+    try:
+        f = open(LOG_FILE, 'rb')
+    except FileNotFoundError:
+        return
+    with f:
+        lo, hi = 0, os.fstat(f.fileno()).st_size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            _, entry_time = first_log_line_at(f, mid)
+            if entry_time is None or entry_time >= cutoff:
+                hi = mid
+            else:
+                lo = mid + 1
+        start, _ = first_log_line_at(f, lo)
+        if start == 0:
+            return
+
+        # Close our append handle so the file can be replaced (required on Windows)
+        if log_handle:
+            log_handle.close()
+            log_handle = None
+
+        tmp_path = LOG_FILE + ".tmp"
+        f.seek(start)
+        with open(tmp_path, 'wb') as out:
+            shutil.copyfileobj(f, out)
+    os.replace(tmp_path, LOG_FILE)
+
 def printLog(*args, **kwargs):
+    global log_handle, log_last_compact
     now = datetime.now()
     timestamp = now.strftime('%Y-%m-%d %H:%M:%S')
 
@@ -165,33 +302,19 @@ def printLog(*args, **kwargs):
     except BrokenPipeError:
         pass
 
-    if not int(LOG_ENABLE):
+    if not LOG_ENABLE:
         return
 
     try:
-        try:
-            with open(LOG_FILE, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-        except FileNotFoundError:
-            lines = []
-
-        # Retain only lines within log retention period
-        cutoff = now - timedelta(days=LOG_RETENTION_DAYS)
-        kept_lines = []
-        for line in lines:
-            try:
-                if line.startswith("["):
-                    ts_str = line.split("]", 1)[0].strip("[]")
-                    entry_time = datetime.strptime(ts_str, '%Y-%m-%d %H:%M:%S')
-                    if entry_time >= cutoff:
-                        kept_lines.append(line)
-            except Exception:
-                kept_lines.append(line)
-
-        kept_lines.append(log_entry + "\n")
+        with log_lock:
+            now_ts = time.time()
+            if now_ts - log_last_compact >= LOG_COMPACT_INTERVAL:
+                log_last_compact = now_ts
+                compact_log(now)
 
-        with open(LOG_FILE, 'w', encoding='utf-8') as f:
-            f.writelines(kept_lines)
+            if log_handle is None:
+                log_handle = open(LOG_FILE, 'a', encoding='utf-8', buffering=1)  # line-buffered
+            log_handle.write(log_entry + "\n")
 
     except Exception as e:
         try:
@@ -202,7 +325,7 @@ def printLog(*args, **kwargs):
 # Run the script
 if __name__ == "__main__":
     load_config()
-    CAMID_LIST = [prefix.strip() + "_" for prefix in EMAIL_CAMID.split(",")]
+    CAMID_PREFIXES = tuple(prefix.strip() + "_" for prefix in EMAIL_CAMID.split(","))
     printLog(f"🔍 📧 {os.path.basename(__file__)} Cam Id's {EMAIL_CAMID} | Batch setting {BATCH_INTERVAL} sec")
     printLog(f"📂 Watching directory: {ZM_AI_DETECTIONS_DIR}")
     start_monitoring()
@@ -4,19 +4,45 @@ import io
 import sys
 import requests
 import urllib3
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
+from urllib3.util.retry import Retry
 import time
+import shutil
 import argparse
 import configparser
 import urllib.parse
 from datetime import datetime, timedelta
-from collections import defaultdict
+import bisect
+from collections import defaultdict, deque, OrderedDict
 import json
 import traceback
+import sqlite3
+import threading
+import queue
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson  # faster parsing of ZM API responses
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:
+    json_loads = json.loads
+    def json_dumps(obj):
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 config = None
 
+# One keep-alive session for every ZM call so TCP/TLS connections are reused
+# across polls instead of re-handshaking on each request.
+SESSION = requests.Session()
+SESSION.verify = False
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=Retry(total=2, backoff_factor=0.1))
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
 def load_config(config_file="settings.ini"):
     global config
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -35,8 +61,10 @@ def load_config(config_file="settings.ini"):
 
     # === GENERAL ===
     globals()["MON_CAMID"] = config.get("general", "MON_CAMID", fallback="")
+    globals()["ALLOWED_MONITORS"] = parse_monitors()
     ZM_HOST = config.get("general", "ZM_HOST", fallback="").rstrip("/")
     globals()["ZM_HOST"] = ZM_HOST
+    globals()["EVENTS_INDEX_URL"] = f"{ZM_HOST}/zm/api/events/index"
     globals()["LOG_ENABLE"] = config.getboolean("general", "LOG_ENABLE", fallback=True)
 
     # === PATHS ===
@@ -47,10 +75,12 @@ def load_config(config_file="settings.ini"):
     globals()["ZM_PASS"] = config.get("credentials", "ZM_PASS", fallback="")
     globals()["BAUTH_USER"] = config.get("credentials", "BAUTH_USER", fallback="")
     globals()["BAUTH_PWD"] = config.get("credentials", "BAUTH_PWD", fallback="")
+    SESSION.auth = HTTPBasicAuth(BAUTH_USER, BAUTH_PWD)
 
     # === DETECTION ===
     globals()["THRESHOLD"] = config.getint("detection", "THRESHOLD", fallback=10)
     globals()["TIME_WINDOW"] = config.getint("detection", "TIME_WINDOW", fallback=60)
+    globals()["RATE_WINDOW"] = timedelta(seconds=globals()["TIME_WINDOW"])
 
     # === LOGGING RETENTION (optional override) ===
     globals()["LOG_RETENTION_DAYS"] = config.getint("general", "LOG_RETENTION_DAYS", fallback=1)
@@ -59,9 +89,15 @@ def load_config(config_file="settings.ini"):
 # Globals for the script only
 # ==========================
 
-PROCESSED_IDS_FILE = "downloaded_ids.txt"
+PROCESSED_IDS_DB = "downloaded_ids.db"
 PENDING_CHECK_LOOKBACK_MINUTES = 5
 CHECK_INTERVAL_SECONDS = 10
+DOWNLOAD_CHUNK_BYTES = 1 << 20  # copy event videos to disk 1 MiB at a time
+DOWNLOAD_WORKERS = 4  # event videos downloaded in parallel
+POLL_MIN_SECONDS = 2  # poll again quickly while new events keep arriving
+POLL_MAX_SECONDS = 30  # ceiling for the idle backoff
+POLL_IDLE_BACKOFF_AFTER = 5  # empty polls before the interval starts doubling
+PENDING_BACKOFF_MAX_SECONDS = 60  # longest wait between re-checks of a still-running event
 PROCESSED_RETENTION_HOURS = 1  # Limit how long to keep processed IDs
 TOKEN_EXPIRY = 1
 access_token = None
@@ -78,12 +114,26 @@ else:
 script_basename = os.path.splitext(os.path.basename(sys.argv[0]))[0]
 LOG_FILE = os.path.join(base_path, f"{script_basename}.log")
 TOKEN_FILE = os.path.join(os.path.dirname(__file__), "zm_token.json")
-file_timestamps = defaultdict(list)
 
 # ==========================
 # Auth
 # ==========================
 
+def restore_token():
+    """Reuse a still-valid token from TOKEN_FILE (left by a previous run) instead of logging in again."""
+    global TOKEN_EXPIRY, access_token, AUTH_DISABLED
+    try:
+        with open(TOKEN_FILE, "rb") as f:
+            data = json_loads(f.read())
+        if data["expires"] > time.time() + 60:
+            access_token = data["token"]
+            TOKEN_EXPIRY = data["expires"]
+            AUTH_DISABLED = (access_token == "AUTH_DISABLED")
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        printLog(f"⚠️ Ignoring unreadable token file: {e}")
+
 def login_bauth():
     global TOKEN_EXPIRY, access_token, AUTH_DISABLED
     current_time = time.time()
@@ -92,16 +142,14 @@ def login_bauth():
         return
 
     url = f'{ZM_HOST}/zm/api/host/login.json'
-    response = requests.post(
+    response = SESSION.post(
         url,
-        auth=HTTPBasicAuth(BAUTH_USER, BAUTH_PWD),
         data={'user': ZM_USER, 'pass': ZM_PASS, 'stateful': '1'},
-        verify=False
     )
 
     if response.status_code == 200:
         try:
-            a = response.json()
+            a = json_loads(response.content)
         except Exception as e:
             printLog(f"❌ Invalid JSON in login response: {e}")
             return None
@@ -112,8 +160,8 @@ def login_bauth():
             access_token = token
             TOKEN_EXPIRY = current_time + 3600
             try:
-                with open(TOKEN_FILE, "w") as f:
-                    json.dump({"token": access_token, "expires": TOKEN_EXPIRY}, f)
+                with open(TOKEN_FILE, "wb") as f:
+                    f.write(json_dumps({"token": access_token, "expires": TOKEN_EXPIRY}))
             except Exception as e:
                 printLog(f"⚠️ Failed to write token file: {e}")
             return access_token
@@ -125,8 +173,8 @@ def login_bauth():
             TOKEN_EXPIRY = time.time() + 10*365*24*3600  # 10 years in future
 
             try:
-                with open(TOKEN_FILE, "w") as f:
-                    json.dump({"token": access_token, "expires": TOKEN_EXPIRY}, f)
+                with open(TOKEN_FILE, "wb") as f:
+                    f.write(json_dumps({"token": access_token, "expires": TOKEN_EXPIRY}))
             except Exception as e:
                 printLog(f"⚠️ Failed to write token file for AUTH_DISABLED: {e}")
 
@@ -138,48 +186,127 @@ def login_bauth():
 
     # Non-200: failed login
     try:
-        err = response.json()
+        err = json_loads(response.content)
     except Exception:
         err = response.text[:300]
     printLog(f"❌ Login failed ({response.status_code}): {err}")
     return None
 
 
+def invalidate_token():
+    global access_token
+    access_token = None
+
 def parse_monitors():
-    return [int(x.strip()) for x in MON_CAMID.split(",") if x.strip().isdigit()]
+    # Monitor IDs as strings, matching the MonitorId values in ZM's JSON
+    return frozenset(str(int(x.strip())) for x in MON_CAMID.split(",") if x.strip().isdigit())
 
 # ==========================
 # Processed ID Handling
 # ==========================
 
+PROCESSED_IDS_CAP = 10_000  # upper bound on IDs kept in memory (oldest evicted first)
+PROCESSED_FLUSH_SECONDS = 1  # how often the writer thread persists queued IDs
+PROCESSED_EXPIRE_SECONDS = 60  # how often expired IDs are swept from memory and the DB
+processed_expired_at = 0.0
+
+# Persistence is deferred to one writer thread that owns the SQLite connection:
+# the loop only queues ("mark", eid, ts) and ("expire", cutoff) items.
+dirty_processed = queue.Queue()
+writer_stop = threading.Event()
+writer_thread = None
+
+def open_processed_db():
+    conn = sqlite3.connect(PROCESSED_IDS_DB, isolation_level=None, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS processed(eid TEXT PRIMARY KEY, ts INTEGER NOT NULL)")
+    return conn
+
 def load_processed_ids():
-    if not os.path.exists(PROCESSED_IDS_FILE):
-        print(f"⚠️ {PROCESSED_IDS_FILE} does not exist. Returning empty processed ID list.")
-        return {}
-    ids = {}
-    cutoff = datetime.now() - timedelta(hours=PROCESSED_RETENTION_HOURS)
-    with open(PROCESSED_IDS_FILE, "r") as f:
-        for line in f:
-            parts = line.strip().split()
-            if len(parts) != 2:
-                continue
-            eid, ts = parts
-            try:
-                dt = datetime.strptime(ts, "%Y-%m-%d %H:%M:%S")
-                if dt >= cutoff:
-                    ids[eid] = ts
-            except:
-                continue
+    ids = OrderedDict()
+    cutoff = int(time.time()) - PROCESSED_RETENTION_HOURS * 3600
+    conn = open_processed_db()
+    try:
+        rows = conn.execute(
+            "SELECT eid, ts FROM processed WHERE ts >= ? ORDER BY ts DESC LIMIT ?",
+            (cutoff, PROCESSED_IDS_CAP),
+        ).fetchall()
+    finally:
+        conn.close()
+    for eid, ts in reversed(rows):
+        ids[eid] = ts
     return ids
 
-def mark_id_as_processed(event_id, processed_ids):
-    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+def mark_id_as_processed(event_id, processed_ids, event_time=None):
+    ts = int((event_time or datetime.now()).timestamp())
     processed_ids[event_id] = ts
+    processed_ids.move_to_end(event_id)
+    if len(processed_ids) > PROCESSED_IDS_CAP:
+        processed_ids.popitem(last=False)
+    dirty_processed.put(("mark", event_id, ts))
 
 def cleanup_processed_ids(processed_ids):
-    with open(PROCESSED_IDS_FILE, "w") as f:
-        for eid, ts in processed_ids.items():
-            f.write(f"{eid} {ts}\n")
+    """Expire IDs older than PROCESSED_RETENTION_HOURS, at most once per PROCESSED_EXPIRE_SECONDS."""
+    global processed_expired_at
+    now_ts = time.time()
+    if now_ts - processed_expired_at < PROCESSED_EXPIRE_SECONDS:
+        return
+
+    cutoff = int(now_ts) - PROCESSED_RETENTION_HOURS * 3600
+    for eid in [eid for eid, ts in processed_ids.items() if ts < cutoff]:
+        del processed_ids[eid]
+    dirty_processed.put(("expire", cutoff))
+    processed_expired_at = now_ts
+
+def flush_processed_ids(conn):
+    marks = []
+    expire_before = None
+    while True:
+        try:
+            item = dirty_processed.get_nowait()
+        except queue.Empty:
+            break
+        if item[0] == "expire":
+            expire_before = item[1]
+        else:
+            marks.append(item[1:])
+
+    if not marks and expire_before is None:
+        return
+    try:
+        conn.execute("BEGIN")
+        if marks:
+            conn.executemany("INSERT OR REPLACE INTO processed(eid, ts) VALUES (?, ?)", marks)
+        if expire_before is not None:
+            conn.execute("DELETE FROM processed WHERE ts < ?", (expire_before,))
+        conn.execute("COMMIT")
+    except Exception as e:
+        try:
+            conn.execute("ROLLBACK")
+        except Exception:
+            pass
+        printLog(f"⚠️ Failed to persist processed IDs: {e}")
+
+def processed_writer():
+    conn = open_processed_db()
+    try:
+        while not writer_stop.wait(PROCESSED_FLUSH_SECONDS):
+            flush_processed_ids(conn)
+        flush_processed_ids(conn)
+    finally:
+        conn.close()
+
+def start_processed_writer():
+    global writer_thread
+    if writer_thread is None:
+        writer_thread = threading.Thread(target=processed_writer, name="processed_writer", daemon=True)
+        writer_thread.start()
+        atexit.register(stop_processed_writer)
+
+def stop_processed_writer():
+    writer_stop.set()
+    if writer_thread is not None:
+        writer_thread.join(timeout=5)
 
 # ==========================
 # Event Functions
@@ -189,38 +316,38 @@ def get_events_in_range_by_start(start_dt, end_dt):
     login_bauth()
 
     start_str = start_dt.strftime("%Y-%m-%d %H:%M:%S")
-    start_encoded = urllib.parse.quote(f"StartTime >=:{start_str}")
-    auth = HTTPBasicAuth(BAUTH_USER, BAUTH_PWD)
-    allowed_monitors = parse_monitors()
+    start_filter = urllib.parse.quote(f"StartTime >=:{start_str}")
+    url = f"{EVENTS_INDEX_URL}/{start_filter}.json"
     all_results = []
     page = 1
     limit = 100
+    params = {"sort": "StartTime", "direction": "desc", "limit": limit, "token": access_token}
 
     while True:
-        url = (
-            f"{ZM_HOST}/zm/api/events/index/{start_encoded}.json"
-            f"?sort=StartTime&direction=desc&limit={limit}&page={page}&token={access_token}"
-        )
+        params["page"] = page
 
         try:
-            response = requests.get(url, auth=auth, verify=False)
+            response = SESSION.get(url, params=params)
+            if response.status_code == 401 and not AUTH_DISABLED:
+                invalidate_token()  # e.g. a restored token the server no longer accepts
             if response.status_code != 200:
                 printLog(f"⚠️ Failed to retrieve events (page {page}): {response.status_code} - {response.text}")
                 break
 
-            data = response.json()
+            data = json_loads(response.content)
             raw_events = data.get("events", [])
 #            printLog(f"📦 Page {page}: Retrieved {len(raw_events)} event(s)")
 
             for ev in raw_events:
                 e = ev["Event"]
-                if int(e["MonitorId"]) in allowed_monitors:
+                monitor_id = str(e["MonitorId"])
+                if monitor_id in ALLOWED_MONITORS:
                     all_results.append({
                         "Id": str(e["Id"]),
                         "StartTime": e["StartTime"],
                         "StartDateTime": e.get("StartDateTime"),
                         "EndDateTime": e.get("EndDateTime"),
-                        "MonitorId": str(e["MonitorId"])
+                        "MonitorId": monitor_id
                     })
 
             if len(raw_events) < limit:
@@ -239,13 +366,12 @@ def get_event_by_id(event_id):
         return
 
     url = f"{ZM_HOST}/zm/api/events/view/{event_id}.json?token={access_token}"
-    auth = HTTPBasicAuth(BAUTH_USER, BAUTH_PWD)
 
     try:
-        response = requests.get(url, auth=auth, verify=False)
+        response = SESSION.get(url)
         if response.status_code != 200:
             return None
-        ev = response.json().get("event")
+        ev = json_loads(response.content).get("event")
         return {
             "Id": str(ev["Event"]["Id"]),
             "EndDateTime": ev["Event"].get("EndDateTime"),
@@ -267,13 +393,12 @@ def get_no_yolo_zones(monitor_id: str):
         return []
 
     url = f"{ZM_HOST}/zm/api/zones.json?token={access_token}"
-    auth = HTTPBasicAuth(BAUTH_USER, BAUTH_PWD)
     try:
-        r = requests.get(url, auth=auth, verify=False, timeout=10)
+        r = SESSION.get(url, timeout=10)
         if r.status_code != 200:
             printLog(f"⚠️ Failed to retrieve zones: {r.status_code} - {r.text[:200]}")
             return []
-        data = r.json()
+        data = json_loads(r.content)
     except Exception as e:
         printLog(f"⚠️ Error retrieving zones: {e}")
         return []
@@ -308,8 +433,8 @@ def write_no_yolo_sidecar(video_path: str, monitor_id: str, event_id: str = ""):
             "monitor_id": str(monitor_id),
             "zones": zones,
         }
-        with open(sidecar_path, "w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False)
+        with open(sidecar_path, "wb") as f:
+            f.write(json_dumps(payload))
     except Exception as e:
         printLog(f"⚠️ Failed to write no_yolo sidecar for {video_path}: {e}")
 
@@ -325,45 +450,93 @@ def download_event_video(event_id, monitor_id):
 
     os.makedirs(ZM_ALARM_QUEUE, exist_ok=True)
 
+    # Download to a .part file so yolo8_analyze never picks up a half-written .mp4
+    part_path = output_path + ".part"
+
     try:
-        r = requests.get(video_url, auth=HTTPBasicAuth(BAUTH_USER, BAUTH_PWD), verify=False, stream=True)
-        if r.status_code == 200:
-            with open(output_path, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
-#            printLog(f"Downloaded event {event_id} video to {output_path}")
-            # Write privacy-zone sidecar for YOLO (zones named 'no_yolo')
-            write_no_yolo_sidecar(output_path, monitor_id, event_id)
-            return True
-        else:
-            printLog(f"⚠️ Failed to download video for event {event_id}: {r.status_code}")
+        with SESSION.get(video_url, stream=True) as r:
+            if r.status_code == 200:
+                r.raw.decode_content = True
+                with open(part_path, 'wb') as f:
+                    shutil.copyfileobj(r.raw, f, length=DOWNLOAD_CHUNK_BYTES)
+#                printLog(f"Downloaded event {event_id} video to {output_path}")
+                # Write privacy-zone sidecar for YOLO (zones named 'no_yolo') before the video appears
+                write_no_yolo_sidecar(output_path, monitor_id, event_id)
+                os.replace(part_path, output_path)
+                return True
+            else:
+                printLog(f"⚠️ Failed to download video for event {event_id}: {r.status_code}")
     except Exception as e:
         printLog(f"❌ Error downloading video for event {event_id}: {e}")
+        try:
+            os.remove(part_path)
+        except OSError:
+            pass
     
     return False    
 
+# Downloads run on a small pool so one slow video doesn't hold up newer events
+DOWNLOAD_POOL = ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS, thread_name_prefix="zm_download")
+downloads_in_flight = {}  # eid -> Future
+
+def submit_download(event_id, monitor_id):
+    if event_id in downloads_in_flight:
+        return
+    future = DOWNLOAD_POOL.submit(download_event_video, event_id, monitor_id)
+    downloads_in_flight[event_id] = future
+
+    def _done(f):
+        downloads_in_flight.pop(event_id, None)
+        if f.exception() is not None:
+            printLog(f"❌ Download worker failed for event {event_id}: {f.exception()}")
+    future.add_done_callback(_done)
+
 # ==========================
 # Monitor Loop
 # ==========================
 
-from collections import defaultdict
-
-file_timestamps = defaultdict(list)
+# Per-camera event start times inside the rate-limit window, oldest first
+file_timestamps = defaultdict(deque)
+
+def rate_limit_exceeded(cam_id, event_time):
+    """Record event_time for cam_id; True if the camera is over THRESHOLD events per TIME_WINDOW."""
+    window = file_timestamps[cam_id]
+    window_start = event_time - RATE_WINDOW
+    while window and window[0] < window_start:
+        window.popleft()
+    if not window or event_time >= window[-1]:
+        window.append(event_time)
+    else:
+        bisect.insort(window, event_time)  # late-finishing pending event
+    return len(window) > THRESHOLD
 
 def loop_monitor():
     printLog(f"❤️  Starting polling Zoneminder: {ZM_HOST}")
     processed_ids = load_processed_ids()
+    start_processed_writer()
     pending_events = {}
+    pending_checks = {}  # eid -> (next re-check time, current backoff) for still-running events
+    last_seen = None  # newest StartTime returned so far; the next query starts there
+    idle_polls = 0
+    sleep_seconds = CHECK_INTERVAL_SECONDS
 
     while True:
+        found_new = False
         try:
             now = datetime.now()
             lookback = now - timedelta(minutes=PENDING_CHECK_LOOKBACK_MINUTES)
+            since = max(last_seen, lookback) if last_seen else lookback
 
-            events = get_events_in_range_by_start(lookback, now)
+            events = get_events_in_range_by_start(since, now)
 #            print(f"Fetched {len(events)} events")
+            if events:
+                # Results are sorted newest first
+                try:
+                    last_seen = datetime.strptime(events[0]["StartTime"], "%Y-%m-%d %H:%M:%S")
+                except (KeyError, TypeError, ValueError):
+                    pass
 
-            for ev in events:
+            for ev in reversed(events):  # oldest first keeps the rate-limit window ordered
 
             # make sure it is a good event
                 required_keys = {"Id", "MonitorId", "StartDateTime"}
@@ -375,27 +548,25 @@ def loop_monitor():
                 cam_id = str(ev["MonitorId"])
                 if eid in processed_ids:
                     continue
+                if eid not in pending_events:
+                    found_new = True
 
                 if ev["EndDateTime"]:
 
                     event_time = datetime.strptime(ev["StartDateTime"], "%Y-%m-%d %H:%M:%S")
 
                     # ✅ Use event_time for sliding window
-                    window_start = event_time - timedelta(seconds=int(TIME_WINDOW))
-                    file_timestamps[cam_id] = [t for t in file_timestamps[cam_id] if t >= window_start]
-                    file_timestamps[cam_id].append(event_time)
-
-                    if len(file_timestamps[cam_id]) > int(THRESHOLD):
+                    if rate_limit_exceeded(cam_id, event_time):
                         url = f'{ZM_HOST}/zm?view=event&eid={eid}'
                         printLog(f"📌 Rate Limit Exceeded Skipped! {event_time} camId={cam_id} Event=[link:{url}|{eid}]")
-                        processed_ids[eid] = event_time.strftime("%Y-%m-%d %H:%M:%S")
+                        mark_id_as_processed(eid, processed_ids, event_time)
                         continue
 
-                    processed_ids[eid] = event_time.strftime("%Y-%m-%d %H:%M:%S")
+                    mark_id_as_processed(eid, processed_ids, event_time)
                     url = f"{ZM_HOST}/zm?view=event&eid={eid}"
                     printLog(f"🆕 {ev['StartDateTime']} camId={cam_id} Event=[link:{url}|{eid}]")
                     pending_events.pop(eid, None)
-                    download_event_video(eid, cam_id)
+                    submit_download(eid, cam_id)
                 else:
                     pending_events[eid] = ev
 
@@ -404,16 +575,26 @@ def loop_monitor():
                     pending_events.pop(eid, None)
                     continue
 
+                next_check, backoff = pending_checks.get(eid, (0.0, 0))
+                if time.monotonic() < next_check:
+                    continue
+
                 ev_updated = get_event_by_id(eid)
                 ev_original = pending_events[eid]
                 
                 if not ev_updated or not {"Id", "MonitorId"}.issubset(ev_updated.keys()):
-                    printLog(f"⚠️ Skipping pending event {eid}: missing required fields on retry: {ev_updated}")
-                    pending_events.pop(eid, None)
+                    # Keep it pending: the query cursor has moved past its StartTime, so
+                    # this re-check is the only way the event gets picked up again
+                    printLog(f"⚠️ Pending event {eid}: fetch failed or incomplete, will retry: {ev_updated}")
+                    backoff = min(PENDING_BACKOFF_MAX_SECONDS, backoff * 2) if backoff else CHECK_INTERVAL_SECONDS
+                    pending_checks[eid] = (time.monotonic() + backoff, backoff)
                     continue
 
                 if not ev_updated.get("EndDateTime"):
-                    continue  # Still not ended
+                    # Still not ended: back off 10s, 20s, 40s, ... up to PENDING_BACKOFF_MAX_SECONDS
+                    backoff = min(PENDING_BACKOFF_MAX_SECONDS, backoff * 2) if backoff else CHECK_INTERVAL_SECONDS
+                    pending_checks[eid] = (time.monotonic() + backoff, backoff)
+                    continue
 
                 if "StartDateTime" not in ev_original:
                     printLog(f"⚠️ Skipping pending event {eid}: missing StartDateTime in original: {ev_original}")
@@ -421,24 +602,23 @@ def loop_monitor():
                     continue
                     
                 cam_id = str(ev_updated["MonitorId"])
-                event_time = datetime.strptime(ev["StartDateTime"], "%Y-%m-%d %H:%M:%S")
-                window_start = event_time - timedelta(seconds=int(TIME_WINDOW))
-                file_timestamps[cam_id] = [t for t in file_timestamps[cam_id] if t >= window_start]
-                file_timestamps[cam_id].append(event_time)
-
-                if len(file_timestamps[cam_id]) > int(THRESHOLD):
+                event_time = datetime.strptime(ev_original["StartDateTime"], "%Y-%m-%d %H:%M:%S")
+                if rate_limit_exceeded(cam_id, event_time):
                     url = f'{ZM_HOST}/zm?view=event&eid={eid}'
                     printLog(f"📌 Rate Limit Exceeded Skipped! {event_time} camId={cam_id} Event=[link:{url}|{eid}]")
-                    processed_ids[eid] = event_time.strftime("%Y-%m-%d %H:%M:%S")
+                    mark_id_as_processed(eid, processed_ids, event_time)
                     pending_events.pop(eid)
                     continue
 
 
-                processed_ids[eid] = event_time.strftime("%Y-%m-%d %H:%M:%S")
+                mark_id_as_processed(eid, processed_ids, event_time)
                 url = f"{ZM_HOST}/zm?view=event&eid={eid}"
                 printLog(f"🆕 {event_time} camId={cam_id} Event=[link:{url}|{eid}]")
                 pending_events.pop(eid)
-                download_event_video(eid, cam_id)
+                submit_download(eid, cam_id)
+
+            for eid in [eid for eid in pending_checks if eid not in pending_events]:
+                del pending_checks[eid]
 
             cleanup_processed_ids(processed_ids)
 
@@ -451,10 +631,82 @@ def loop_monitor():
                 printLog(f"❌ Exception in main loop: {e}")
                 printLog(f"🧵 Traceback:\n{tb_str}")
 
-        time.sleep(CHECK_INTERVAL_SECONDS)
+        # Adaptive poll interval: fast while events arrive, back off when idle
+        if found_new:
+            idle_polls = 0
+            sleep_seconds = POLL_MIN_SECONDS
+        else:
+            idle_polls += 1
+            if idle_polls < POLL_IDLE_BACKOFF_AFTER:
+                sleep_seconds = CHECK_INTERVAL_SECONDS
+            else:
+                sleep_seconds = min(POLL_MAX_SECONDS, sleep_seconds * 2)
+        if pending_events:
+            sleep_seconds = min(sleep_seconds, CHECK_INTERVAL_SECONDS)
+
+        time.sleep(sleep_seconds)
+
 
+# Log lines are appended through one handle; retention is applied by a periodic
+# compaction instead of re-reading and rewriting the whole file on every line.
+LOG_COMPACT_INTERVAL = 60  # seconds between retention sweeps of LOG_FILE
+log_handle = None
+log_last_compact = 0.0
+log_lock = threading.Lock()  # printLog is called from several threads
+
+def first_log_line_at(f, pos):
+    """Offset and timestamp of the first '[YYYY-mm-dd HH:MM:SS]' line starting at or after pos."""
+    if pos:
+        f.seek(pos - 1)
+        f.readline()  # finish the line that pos falls in (no-op if pos starts a line)
+    else:
+        f.seek(0)
+    while True:
+        offset = f.tell()
+        line = f.readline()
+        if not line:
+            return offset, None
+        if line.startswith(b"["):
+            try:
+                return offset, datetime.strptime(line[1:20].decode('ascii'), '%Y-%m-%d %H:%M:%S')
+            except ValueError:
+                pass
+
+def compact_log(now):
+    global log_handle
+    # Log lines are appended in time order, so bisect over byte offsets for the
+    # first line inside the retention window instead of parsing every line.
+    cutoff = now - timedelta(days=LOG_RETENTION_DAYS)
+    try:
+        f = open(LOG_FILE, 'rb')
+    except FileNotFoundError:
+        return
+    with f:
+        lo, hi = 0, os.fstat(f.fileno()).st_size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            _, entry_time = first_log_line_at(f, mid)
+            if entry_time is None or entry_time >= cutoff:
+                hi = mid
+            else:
+                lo = mid + 1
+        start, _ = first_log_line_at(f, lo)
+        if start == 0:
+            return
+
+        # Close our append handle so the file can be replaced (required on Windows)
+        if log_handle:
+            log_handle.close()
+            log_handle = None
+
+        tmp_path = LOG_FILE + ".tmp"
+        f.seek(start)
+        with open(tmp_path, 'wb') as out:
+            shutil.copyfileobj(f, out)
+    os.replace(tmp_path, LOG_FILE)
 
 def printLog(*args, **kwargs):
+    global log_handle, log_last_compact
     now = datetime.now()
     timestamp = now.strftime('%Y-%m-%d %H:%M:%S')
 
@@ -468,33 +720,19 @@ def printLog(*args, **kwargs):
     except BrokenPipeError:
         pass
 
-    if not int(LOG_ENABLE):
+    if not LOG_ENABLE:
         return
 
     try:
-        try:
-            with open(LOG_FILE, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-        except FileNotFoundError:
-            lines = []
-
-        # Retain only lines within log retention period
-        cutoff = now - timedelta(days=LOG_RETENTION_DAYS)
-        kept_lines = []
-        for line in lines:
-            try:
-                if line.startswith("["):
-                    ts_str = line.split("]", 1)[0].strip("[]")
-                    entry_time = datetime.strptime(ts_str, '%Y-%m-%d %H:%M:%S')
-                    if entry_time >= cutoff:
-                        kept_lines.append(line)
-            except Exception:
-                kept_lines.append(line)
-
-        kept_lines.append(log_entry + "\n")
+        with log_lock:
+            now_ts = time.time()
+            if now_ts - log_last_compact >= LOG_COMPACT_INTERVAL:
+                log_last_compact = now_ts
+                compact_log(now)
 
-        with open(LOG_FILE, 'w', encoding='utf-8') as f:
-            f.writelines(kept_lines)
+            if log_handle is None:
+                log_handle = open(LOG_FILE, 'a', encoding='utf-8', buffering=1)  # line-buffered
+            log_handle.write(log_entry + "\n")
 
     except Exception as e:
         try:
@@ -518,7 +756,8 @@ if __name__ == "__main__":
     parser.add_argument("--loop", action="store_true", help="Run monitoring loop")
 
     args = parser.parse_args()
-    login_bauth()  # 🔐 always acquire token once
+    restore_token()
+    login_bauth()  # 🔐 always acquire token once (no-op if the saved one is still valid)
 
     if args.loop:
         loop_monitor()
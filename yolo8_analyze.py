@@ -7,12 +7,32 @@ import os
 import io
 import time
 import sys
-import glob
+import queue
+import shutil
+import threading
 import configparser
 from datetime import datetime, timedelta
 import json
 from ultralytics import YOLO
 import torch
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEventHandler
+
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:  # not Linux / not installed: use watchdog's Observer instead
+    INotify = None
+
+try:
+    import simplejpeg
+except ImportError:  # optional: cv2.imwrite is used instead
+    simplejpeg = None
+
+try:
+    import av
+    from av.codec.hwaccel import HWAccel
+except ImportError:  # PyAV is optional: decode_backend falls through to OpenCV
+    av = None
 
 config = None
 
@@ -47,6 +67,11 @@ def load_config(config_file="settings.ini"):
     globals()["USE_BOX"] = config.getboolean("detection", "USE_BOX", fallback=True)
     globals()["CONFIDENCE_THRESHOLD"] = config.getfloat("detection", "CONFIDENCE_THRESHOLD", fallback=0.7)
     globals()["OBJ_LIST"] = [item.strip() for item in config.get("detection", "OBJ_LIST", fallback="").split(",") if item.strip()]
+    globals()["BATCH_SIZE"] = max(1, config.getint("detection", "BATCH_SIZE", fallback=16))
+    globals()["DECODE_BACKEND"] = config.get("detection", "DECODE_BACKEND", fallback="auto").strip().lower()
+    globals()["DECODE_WORKERS"] = max(1, config.getint("detection", "DECODE_WORKERS", fallback=min(4, max(1, (os.cpu_count() or 2) // 2))))
+    globals()["KEYFRAMES_ONLY"] = config.getboolean("detection", "KEYFRAMES_ONLY", fallback=False)
+    globals()["TRT_PRECISION"] = config.get("detection", "TRT_PRECISION", fallback="off").strip().lower()
 
     # === LOGGING RETENTION (optional override) ===
     globals()["LOG_RETENTION_DAYS"] = config.getint("general", "LOG_RETENTION_DAYS", fallback=1)
@@ -68,7 +93,30 @@ LOG_FILE = os.path.join(base_path, f"{script_basename}.log")
 
 def load_yolo():
     model_path = os.path.join(YOLO_CONFIG_PATH, "yolov8s.pt")
+    if TRT_PRECISION in ("fp16", "int8") and USE_GPU and torch.cuda.is_available():
+        # TensorRT engine, exported once per precision/batch size and reused afterwards
+        engine_path = os.path.join(YOLO_CONFIG_PATH, f"yolov8s_{TRT_PRECISION}_b{BATCH_SIZE}.engine")
+        try:
+            if not os.path.exists(engine_path):
+                printLog(f"⚙️ Exporting TensorRT {TRT_PRECISION} engine (one-time, this can take a few minutes)...")
+                exported = YOLO(model_path).export(
+                    format="engine",
+                    half=TRT_PRECISION == "fp16",
+                    int8=TRT_PRECISION == "int8",
+                    imgsz=640,
+                    batch=BATCH_SIZE,
+                    dynamic=True,  # the last batch of a video is usually short
+                    device=0,
+                )
+                os.replace(exported, engine_path)
+            return YOLO(engine_path, task="detect")
+        except Exception as e:
+            printLog(f"⚠️ TensorRT engine unavailable, using PyTorch model: {e}", file=sys.stderr)
+
     model = YOLO(model_path)
+    if USE_GPU and torch.cuda.is_available():
+        # NHWC weights let cuDNN pick Tensor Core conv kernels on Ampere and newer
+        model.model = model.model.to(memory_format=torch.channels_last)
     return model
 
 
@@ -122,26 +170,84 @@ def _point_in_poly(cx, cy, poly):
 # ==========================
 # Process Object Detection
 # ==========================
-def detect_objects(frame, model):
-    results = model.predict(frame, conf=CONFIDENCE_THRESHOLD, verbose=False)[0]
-
-    detected_objects = {}
-
-    for box in results.boxes:
-        class_id = int(box.cls[0])
-        confidence = float(box.conf[0])
-        x1, y1, x2, y2 = map(int, box.xyxy[0])
+def _tensor_batch(frames):
+    # GPU-resident BGR frames -> one BCHW RGB 0..1 batch, resized on the GPU so the long side
+    # is 640 and padded to a multiple of 32 (what the CPU letterbox would do). Returns the
+    # per-frame scale so boxes can be mapped back to the original frame.
+    resized, scales = [], []
+    for frame in frames:
+        t = torch.as_tensor(frame, device="cuda")  # frames from a CPU decoder get uploaded
+        h, w = t.shape[:2]
+        r = 640 / max(h, w)
+        t = t.permute(2, 0, 1).flip(0).unsqueeze(0).float().div_(255)
+        t = torch.nn.functional.interpolate(t, size=(round(h * r), round(w * r)), mode="bilinear", align_corners=False, antialias=True)
+        resized.append(t[0])
+        scales.append(r)
+
+    batch_h = -(-max(t.shape[1] for t in resized) // 32) * 32
+    batch_w = -(-max(t.shape[2] for t in resized) // 32) * 32
+    batch = torch.full((len(resized), 3, batch_h, batch_w), 114 / 255, device="cuda")
+    for i, t in enumerate(resized):
+        batch[i, :, :t.shape[1], :t.shape[2]] = t
+    return batch.contiguous(memory_format=torch.channels_last), scales
+
+def detect_objects(frames, model):
+    # One predict call for the whole batch; returns one {obj_name: best} dict per frame.
+    # stream=True hands back each Results as it is post-processed instead of building a list.
+    # The stream is consumed inside inference_mode (no autograd version counters at all)
+    scales = None
+    with torch.inference_mode():
+        if any(isinstance(frame, torch.Tensor) for frame in frames):
+            source, scales = _tensor_batch(frames)
+        else:
+            source = frames
+
+        batch_objects = []
+        results = model.predict(source, conf=CONFIDENCE_THRESHOLD, verbose=False, stream=True)
+        for i, result in enumerate(results):
+            detected_objects = {}
+            r = scales[i] if scales else 1.0
+
+            for box in result.boxes:
+                class_id = int(box.cls[0])
+                confidence = float(box.conf[0])
+                x1, y1, x2, y2 = (int(v / r) for v in box.xyxy[0].tolist())
+
+                obj_name = model.names[class_id]
+                if obj_name in OBJ_LIST:
+                    if obj_name not in detected_objects or confidence > detected_objects[obj_name]["confidence"]:
+                        detected_objects[obj_name] = {
+                            "box": (x1, y1, x2 - x1, y2 - y1),
+                            "confidence": confidence
+                        }
+
+            batch_objects.append(detected_objects)
+
+    return batch_objects
 
-        obj_name = model.names[class_id]
-        if obj_name in OBJ_LIST:
-            if obj_name not in detected_objects or confidence > detected_objects[obj_name]["confidence"]:
-                detected_objects[obj_name] = {
-                    "box": (x1, y1, x2 - x1, y2 - y1),
-                    "confidence": confidence
-                }
 
-    return detected_objects
+# ==========================
+# Save Detection Image
+# ==========================
+JPEG_QUALITY = 95  # same as cv2.imwrite's default
+THUMB_HEIGHT = 200  # dashboard shows thumbs 100px high; 2x for HiDPI screens
+THUMB_QUALITY = 75
+
+def save_jpeg(save_path, frame, quality=JPEG_QUALITY):
+    # libjpeg-turbo via simplejpeg when available, OpenCV's encoder otherwise
+    if simplejpeg is None:
+        cv2.imwrite(save_path, frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        return
+    data = simplejpeg.encode_jpeg(np.ascontiguousarray(frame), quality=quality, colorspace="BGR")
+    with open(save_path, "wb") as f:
+        f.write(data)
 
+def save_thumbnail(save_path, frame):
+    # Small copy for the dashboard grid, in the thumbs/ subfolder (not seen by email_notify)
+    h, w = frame.shape[:2]
+    if h > THUMB_HEIGHT:
+        frame = cv2.resize(frame, (max(1, w * THUMB_HEIGHT // h), THUMB_HEIGHT), interpolation=cv2.INTER_AREA)
+    save_jpeg(os.path.join(ZM_AI_DETECTIONS_DIR, "thumbs", os.path.basename(save_path)), frame, THUMB_QUALITY)
 
 # ==========================
 # Extract Event ID from Path
@@ -155,33 +261,126 @@ def extract_ids(video_path):
     return "unknown", "unknown"
 
 # ==========================
-# Process Video File
+# Video Decoding
 # ==========================
-def process_video(video_path, model, camid, event_id):
+# Each opener returns (fps, frames) where frames(interval) yields (frame_count, frame)
+# for every frame in the video; frame is a BGR numpy array only on every
+# interval-th frame and None otherwise, so skipped frames are never converted.
+def _open_cudacodec(video_path):
+    # NVDEC: decode on the GPU's video engine; sampled frames stay on the GPU as torch tensors
+    reader = cv2.cudacodec.createVideoReader(video_path)
+    reader.set(cv2.cudacodec.ColorFormat_BGR)
+    fps = reader.format().fps
+
+    def frames(interval):
+        frame_count = 0
+        while reader.grab():
+            frame_count += 1
+            if frame_count % interval:
+                yield frame_count, None
+                continue
+            ret, gpu_frame = reader.retrieve()
+            if not ret:
+                break
+            yield frame_count, _gpu_frame_to_tensor(gpu_frame)
+
+    return fps, frames
+
+def _gpu_frame_to_tensor(gpu_frame):
+    # HxWx3 uint8 CUDA tensor sharing a clone of the GpuMat (the reader reuses its own buffer).
+    # OpenCV builds without __cuda_array_interface__ get a host copy instead.
+    try:
+        return torch.as_tensor(gpu_frame.clone(), device="cuda")
+    except (TypeError, RuntimeError):
+        return gpu_frame.download()
+
+def _open_pyav(video_path):
+    hwaccel = HWAccel(device_type="cuda", allow_software_fallback=True) if USE_GPU else None
+    container = av.open(video_path, hwaccel=hwaccel)
+    stream = container.streams.video[0]
+    stream.thread_type = "AUTO"
+    fps = float(stream.average_rate or 0)
+    if KEYFRAMES_ONLY:
+        # The decoder drops P/B frames before decoding them; every frame it returns is sampled
+        stream.codec_context.skip_frame = "NONKEY"
+
+    def frames(interval):
+        if KEYFRAMES_ONLY:
+            interval = 1
+        with container:
+            for frame_count, frame in enumerate(container.decode(stream), 1):
+                if frame_count % interval:
+                    yield frame_count, None
+                else:
+                    yield frame_count, frame.to_ndarray(format="bgr24")
+
+    return fps, frames
+
+def _open_opencv(video_path):
     cap = cv2.VideoCapture(video_path)
-    # ----------------------------
-    # Load no_yolo polygons (once)
-    # ----------------------------
-    ignore_polys = []
+    fps = cap.get(cv2.CAP_PROP_FPS)
+
+    def frames(interval):
+        # grab() only demuxes/decodes; the YUV->BGR retrieve() is paid for sampled frames only
+        frame_count = 0
+        try:
+            while cap.grab():
+                frame_count += 1
+                if frame_count % interval:
+                    yield frame_count, None
+                    continue
+                ret, frame = cap.retrieve()
+                if not ret:
+                    break
+                yield frame_count, frame
+        finally:
+            cap.release()
+
+    return fps, frames
+
+def _cudacodec_available():
     try:
-        zones = _load_no_yolo_sidecar(video_path)
-        if zones:
-            # read one frame to get dimensions then rewind
-            ret0, frame0 = cap.read()
-            if ret0:
-                h0, w0 = frame0.shape[:2]
-                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                ignore_polys = [_coords_to_poly(z, w0, h0) for z in zones]
-            else:
-                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-    except Exception as e:
-        printLog(f"⚠️ no_yolo sidecar parse failed for {video_path}: {e}")
+        return hasattr(cv2, "cudacodec") and cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except cv2.error:
+        return False
+
+def open_video(video_path):
+    # decode_backend = auto | cuda | pyav | opencv; anything that can't open falls back to OpenCV (CPU)
+    openers = []
+    if DECODE_BACKEND in ("auto", "cuda") and USE_GPU and _cudacodec_available():
+        openers.append(("cudacodec", _open_cudacodec))
+    if DECODE_BACKEND in ("auto", "pyav") and av is not None:
+        # keyframes_only is a PyAV feature, so it takes priority under auto
+        openers.insert(0 if KEYFRAMES_ONLY else len(openers), ("pyav", _open_pyav))
+
+    for name, opener in openers:
         try:
-            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-        except Exception:
-            pass
+            return opener(video_path)
+        except Exception as e:
+            printLog(f"⚠️ {name} decode unavailable for {video_path}, falling back: {e}")
+    return _open_opencv(video_path)
+
+# ==========================
+# Process Video File
+# ==========================
+def new_video_job(video_path, camid, event_id):
+    # Per-video state shared by the decode, detect and finish steps
+    return {
+        "video_path": video_path,
+        "camid": camid,
+        "event_id": event_id,
+        "zones": _load_no_yolo_sidecar(video_path),
+        "ignore_polys": [],
+        "best_detections": {},  # best detection for each object across all frames
+        "frame_count": 0,
+        "error": None,
+    }
+
+def decode_video(job, submit):
+    # Decode the job's video and hand every sampled frame to submit(job, frame_idx, frame)
+    video_path = job["video_path"]
+    fps, frames = open_video(video_path)
 
-    fps = cap.get(cv2.CAP_PROP_FPS)
     try:
         # handle NaN, None, or weird low values
         if not fps or fps != fps or fps < 1:
@@ -193,43 +392,61 @@ def process_video(video_path, model, camid, event_id):
         raise ValueError(f"Invalid FPS ({fps}) for {video_path}")
     frame_interval = max(1, int(round(fps)))  # Process 1 frame per second (adjust as needed)
 
-    # Store the best detection for each object across all frames
-    best_detections = {}
-
-    frame_count = 0
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
+    for frame_count, frame in frames(frame_interval):
+        job["frame_count"] = frame_count
 
-        frame_count += 1
+        # Only every frame_interval-th frame is retrieved; the rest come back as None
+        if frame is None:
+            continue
 
-        # Process only keyframes (I-frames)?
-        if frame_count % frame_interval == 0:
-            detected_objects = detect_objects(frame, model)
+        # no_yolo polygons are sized from the first decoded frame
+        if job["zones"] and not job["ignore_polys"]:
+            try:
+                h0, w0 = frame.shape[:2]
+                job["ignore_polys"] = [_coords_to_poly(z, w0, h0) for z in job["zones"]]
+            except Exception as e:
+                job["zones"] = []
+                printLog(f"⚠️ no_yolo sidecar parse failed for {video_path}: {e}")
 
-            for obj_name, data in detected_objects.items():
-                x, y, w, h = data["box"]
+        submit(job, frame_count, frame)
 
-                # Skip detections whose box-center is inside any no_yolo polygon
-                if ignore_polys:
-                    cx = x + w / 2.0
-                    cy = y + h / 2.0
-                    if any(_point_in_poly(cx, cy, poly) for poly in ignore_polys):
-                        continue
-                confidence = data["confidence"]
+def record_detections(job, frame_idx, frame, detected_objects):
+    best_detections = job["best_detections"]
+    ignore_polys = job["ignore_polys"]
 
-                # Track the highest confidence detection across all frames
-                if obj_name not in best_detections or confidence > best_detections[obj_name]["confidence"]:
-                    best_detections[obj_name] = {
-                        "frame": frame.copy(),  # Store the frame for later saving
-                        "box": (x, y, w, h),
-                        "confidence": confidence
-                    }
+    for obj_name, data in detected_objects.items():
+        x, y, w, h = data["box"]
 
-    cap.release()
+        # Skip detections whose box-center is inside any no_yolo polygon
+        if ignore_polys:
+            cx = x + w / 2.0
+            cy = y + h / 2.0
+            if any(_point_in_poly(cx, cy, poly) for poly in ignore_polys):
+                continue
+        confidence = data["confidence"]
 
-    if not frame_count:
+        # Track the highest confidence detection across all frames
+        if obj_name not in best_detections or confidence > best_detections[obj_name]["confidence"]:
+            # Keep a reference, not a copy: every retrieved frame is a fresh array,
+            # so only the current winners stay alive once the batch is dropped
+            best_detections[obj_name] = {
+                "frame_idx": frame_idx,
+                "frame": frame,
+                "box": (x, y, w, h),
+                "confidence": confidence
+            }
+
+def detect_batch(pending, model):
+    # pending: [(job, frame_idx, frame), ...], possibly from several videos
+    batch = [frame for _, _, frame in pending]
+    for (job, frame_idx, frame), detected_objects in zip(pending, detect_objects(batch, model)):
+        record_detections(job, frame_idx, frame, detected_objects)
+
+def finish_video(job):
+    video_path, camid, event_id = job["video_path"], job["camid"], job["event_id"]
+    best_detections = job["best_detections"]
+
+    if not job["frame_count"]:
         printLog(f"⚠️ No frames processed from {video_path}", file=sys.stderr)
         return
         
@@ -246,17 +463,39 @@ def process_video(video_path, model, camid, event_id):
     # Optionally save the best frame for each detected object class
     for obj_name, data in best_detections.items():
         frame = data["frame"]
+        if isinstance(frame, torch.Tensor):
+            frame = frame.contiguous().cpu().numpy()  # only the winners come back from the GPU
         x, y, w, h = data["box"]
         confidence = data["confidence"]
 
-        if int(USE_BOX):
+        if USE_BOX:
+            frame = frame.copy()  # several classes can share a winning frame; don't draw on it
             cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
             label = f"{obj_name}: {int(confidence * 100)}%"
             cv2.putText(frame, label, (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
 
         save_filename = f"{camid}_{event_id}_{obj_name}.jpg"
         save_path = os.path.join(ZM_AI_DETECTIONS_DIR, save_filename)
-        cv2.imwrite(save_path, frame)
+        save_jpeg(save_path, frame)
+        save_thumbnail(save_path, frame)
+
+def process_video(video_path, model, camid, event_id):
+    job = new_video_job(video_path, camid, event_id)
+
+    # Run the sampled frames through the model BATCH_SIZE at a time
+    pending = []
+
+    def submit(job, frame_idx, frame):
+        pending.append((job, frame_idx, frame))
+        if len(pending) >= BATCH_SIZE:
+            detect_batch(pending, model)
+            pending.clear()
+
+    decode_video(job, submit)
+    if pending:
+        detect_batch(pending, model)
+
+    finish_video(job)
 
 def make_folder(path):
     if not os.path.exists(path):
@@ -281,7 +520,66 @@ def make_folder(path):
 # Print to Log
 # ==========================
 
+# Log lines are appended through one handle; retention is applied by a periodic
+# compaction instead of re-reading and rewriting the whole file on every line.
+LOG_COMPACT_INTERVAL = 60  # seconds between retention sweeps of LOG_FILE
+log_handle = None
+log_last_compact = 0.0
+log_lock = threading.Lock()  # serialises appends with compaction
+
+def first_log_line_at(f, pos):
+    """Offset and timestamp of the first '[YYYY-mm-dd HH:MM:SS]' line starting at or after pos."""
+    if pos:
+        f.seek(pos - 1)
+        f.readline()  # finish the line that pos falls in (no-op if pos starts a line)
+    else:
+        f.seek(0)
+    while True:
+        offset = f.tell()
+        line = f.readline()
+        if not line:
+            return offset, None
+        if line.startswith(b"["):
+            try:
+                return offset, datetime.strptime(line[1:20].decode('ascii'), '%Y-%m-%d %H:%M:%S')
+            except ValueError:
+                pass
+
+def compact_log(now):
+    global log_handle
+    # Log lines are appended in time order, so bisect over byte offsets for the
+    # first line inside the retention window instead of parsing every line.
+    cutoff = now - timedelta(days=LOG_RETENTION_DAYS)
+    try:
+        f = open(LOG_FILE, 'rb')
+    except FileNotFoundError:
+        return
+    with f:
+        lo, hi = 0, os.fstat(f.fileno()).st_size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            _, entry_time = first_log_line_at(f, mid)
+            if entry_time is None or entry_time >= cutoff:
+                hi = mid
+            else:
+                lo = mid + 1
+        start, _ = first_log_line_at(f, lo)
+        if start == 0:
+            return
+
+        # Close our append handle so the file can be replaced (required on Windows)
+        if log_handle:
+            log_handle.close()
+            log_handle = None
+
+        tmp_path = LOG_FILE + ".tmp"
+        f.seek(start)
+        with open(tmp_path, 'wb') as out:
+            shutil.copyfileobj(f, out)
+    os.replace(tmp_path, LOG_FILE)
+
 def printLog(*args, **kwargs):
+    global log_handle, log_last_compact
     now = datetime.now()
     timestamp = now.strftime('%Y-%m-%d %H:%M:%S')
 
@@ -295,33 +593,19 @@ def printLog(*args, **kwargs):
     except BrokenPipeError:
         pass
 
-    if not int(LOG_ENABLE):
+    if not LOG_ENABLE:
         return
 
     try:
-        try:
-            with open(LOG_FILE, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-        except FileNotFoundError:
-            lines = []
-
-        # Retain only lines within log retention period
-        cutoff = now - timedelta(days=LOG_RETENTION_DAYS)
-        kept_lines = []
-        for line in lines:
-            try:
-                if line.startswith("["):
-                    ts_str = line.split("]", 1)[0].strip("[]")
-                    entry_time = datetime.strptime(ts_str, '%Y-%m-%d %H:%M:%S')
-                    if entry_time >= cutoff:
-                        kept_lines.append(line)
-            except Exception:
-                kept_lines.append(line)
-
-        kept_lines.append(log_entry + "\n")
+        with log_lock:
+            now_ts = time.time()
+            if now_ts - log_last_compact >= LOG_COMPACT_INTERVAL:
+                log_last_compact = now_ts
+                compact_log(now)
 
-        with open(LOG_FILE, 'w', encoding='utf-8') as f:
-            f.writelines(kept_lines)
+            if log_handle is None:
+                log_handle = open(LOG_FILE, 'a', encoding='utf-8', buffering=1)  # line-buffered
+            log_handle.write(log_entry + "\n")
 
     except Exception as e:
         try:
@@ -330,48 +614,160 @@ def printLog(*args, **kwargs):
             pass
 
 
-def get_oldest_video(folder):
-    videos = glob.glob(os.path.join(folder, "*.mp4"))  # Adjust extension as needed
+def get_oldest_video(folder, exclude=()):
+    # scandir entries carry their own stat, so each video is stat()ed once
+    with os.scandir(folder) as it:
+        videos = [(e.stat().st_mtime, e.path) for e in it if e.name.endswith(".mp4") and e.path not in exclude and e.is_file()]  # Adjust extension as needed
     if not videos:
         return None
-    return min(videos, key=os.path.getmtime)
+    return min(videos, key=lambda v: v[0])[1]
 
-def watchdog_loop():
-    model = load_yolo()
+def remove_queued_video(video_path):
+    try:
+        os.remove(video_path)
+#        printLog(f"🗑️ Deleted {video_path}")
+    except Exception as del_err:
+        printLog(f"❌ Failed to delete {video_path}: {del_err}", file=sys.stderr)
 
-    # ✅ Optional warm-up to trigger CUDA + model initialization
-    if USE_GPU and torch.cuda.is_available():
-        printLog("⚙️ Warming up model on GPU...")
-        dummy = np.zeros((640, 640, 3), dtype=np.uint8)
-        _ = model.predict(dummy, device="cuda", verbose=False)
+    # Delete the sidecar json (if present)
+    sidecar_path = os.path.splitext(video_path)[0] + ".json"
+    try:
+        if os.path.exists(sidecar_path):
+            os.remove(sidecar_path)
+#            printLog(f"🗑️ Deleted {sidecar_path}")
+    except Exception as del_err:
+        printLog(f"❌ Failed to delete {sidecar_path}: {del_err}", file=sys.stderr)
+
+# Set whenever a finished .mp4 lands in the queue folder; the loop sleeps on it when idle
+video_ready = threading.Event()
+QUEUE_RESCAN_SECONDS = 60  # safety-net rescan in case a filesystem event is missed
+
+# Watchdog fallback: poll_zm_for_events.py renames .part -> .mp4 once a download is complete
+class VideoQueueHandler(FileSystemEventHandler):
+    def on_moved(self, event):
+        if not event.is_directory and event.dest_path.endswith(".mp4"):
+            video_ready.set()
+
+    def on_closed(self, event):
+        if not event.is_directory and event.src_path.endswith(".mp4"):
+            video_ready.set()
+
+# Linux: one inotify fd that only reports completed writes/renames
+def watch_inotify(folder):
+    inotify = INotify()
+    inotify.add_watch(folder, inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO)
+    while True:
+        for event in inotify.read(read_delay=50):
+            if event.name.endswith(".mp4"):
+                video_ready.set()
+
+def start_queue_watcher(folder):
+    if INotify is not None:
+        threading.Thread(target=watch_inotify, args=(folder,), daemon=True).start()
+        return
 
+    observer = Observer()
+    observer.daemon = True
+    observer.schedule(VideoQueueHandler(), folder, recursive=False)
+    observer.start()
+
+# ==========================
+# Queue Pipeline (--loop)
+# ==========================
+# DECODE_WORKERS threads each take the oldest unclaimed video and push its sampled
+# frames onto frame_queue; the main thread pulls up to BATCH_SIZE frames from any
+# of them per predict call, so the one model stays busy while videos are queued.
+BATCH_GATHER_SECONDS = 0.05  # how long to wait for more frames before running a short batch
+frame_queue = None  # created in watchdog_loop, bounded so decoders can't run ahead of the GPU
+claimed_videos = set()
+claimed_lock = threading.Lock()
+
+def claim_next_video():
+    with claimed_lock:
+        video_path = get_oldest_video(ZM_ALARM_QUEUE, exclude=claimed_videos)
+        if video_path:
+            claimed_videos.add(video_path)
+        return video_path
+
+def queue_frame(job, frame_idx, frame):
+    frame_queue.put((job, frame_idx, frame))
+
+def decoder_worker():
     while True:
-        video_path = get_oldest_video(ZM_ALARM_QUEUE)
+        # Clear before claiming, never after waiting: a set() that lands after this
+        # clear either finds its video already claimable or wakes the wait below
+        video_ready.clear()
+        video_path = claim_next_video()
         if not video_path:
-            time.sleep(5)
+            # Idle: block until the watcher reports a new video (or the rescan timeout)
+            video_ready.wait(QUEUE_RESCAN_SECONDS)
             continue
 
         camid, event_id = extract_ids(video_path)
 #        printLog(f"⏳ Processing {video_path}")
+        job = new_video_job(video_path, camid, event_id)
         try:
-            process_video(video_path, model, camid, event_id)
+            decode_video(job, queue_frame)
         except Exception as e:
-            printLog(f"⚠️ Error processing {video_path}: {e}", file=sys.stderr)
-        finally:
-            try:
-                os.remove(video_path)
-#                printLog(f"🗑️ Deleted {video_path}")
-            except Exception as del_err:
-                printLog(f"❌ Failed to delete {video_path}: {del_err}", file=sys.stderr)
+            job["error"] = e
+        frame_queue.put((job, None, None))  # end of video: queued after all its frames
+
+def complete_video(job):
+    video_path = job["video_path"]
+    try:
+        if job["error"] is not None:
+            printLog(f"⚠️ Error processing {video_path}: {job['error']}", file=sys.stderr)
+        else:
+            finish_video(job)
+    except Exception as e:
+        printLog(f"⚠️ Error processing {video_path}: {e}", file=sys.stderr)
+    finally:
+        remove_queued_video(video_path)
+        with claimed_lock:
+            claimed_videos.discard(video_path)
+
+def next_batch():
+    # Block for the first item, then gather more until the batch is full or the queue stays empty
+    items = [frame_queue.get()]
+    deadline = time.monotonic() + BATCH_GATHER_SECONDS
+    while len(items) < BATCH_SIZE:
+        remaining = deadline - time.monotonic()
+        try:
+            items.append(frame_queue.get(timeout=remaining) if remaining > 0 else frame_queue.get_nowait())
+        except queue.Empty:
+            break
+    return items
 
-            # Delete the sidecar json (if present)
-            sidecar_path = os.path.splitext(video_path)[0] + ".json"
+def watchdog_loop():
+    global frame_queue
+    model = load_yolo()
+    start_queue_watcher(ZM_ALARM_QUEUE)
+
+    # ✅ Optional warm-up to trigger CUDA + model initialization (engine load, cuDNN autotune)
+    if USE_GPU and torch.cuda.is_available():
+        printLog("⚙️ Warming up model on GPU...")
+        dummy = [np.zeros((640, 640, 3), dtype=np.uint8)] * BATCH_SIZE
+        for _ in range(3):
+            _ = model.predict(dummy, device="cuda", verbose=False)
+
+    frame_queue = queue.Queue(maxsize=BATCH_SIZE * 2)
+    for _ in range(DECODE_WORKERS):
+        threading.Thread(target=decoder_worker, daemon=True).start()
+
+    while True:
+        items = next_batch()
+
+        pending = [item for item in items if item[1] is not None]
+        if pending:
             try:
-                if os.path.exists(sidecar_path):
-                    os.remove(sidecar_path)
-#                    printLog(f"🗑️ Deleted {sidecar_path}")
-            except Exception as del_err:
-                printLog(f"❌ Failed to delete {sidecar_path}: {del_err}", file=sys.stderr)
+                detect_batch(pending, model)
+            except Exception as e:
+                printLog(f"⚠️ Error running detection batch: {e}", file=sys.stderr)
+
+        # End-of-video markers come after all of that video's frames, which are now done
+        for job, frame_idx, _ in items:
+            if frame_idx is None:
+                complete_video(job)
 
 
 
@@ -390,6 +786,7 @@ if __name__ == "__main__":
     args = parser.parse_args()
     CONFIDENCE_THRESHOLD = args.confidence
     make_folder(ZM_AI_DETECTIONS_DIR)
+    make_folder(os.path.join(ZM_AI_DETECTIONS_DIR, "thumbs"))
 
     if USE_GPU and not torch.cuda.is_available():
         printLog("⚠️ GPU requested but not available — falling back to CPU", file=sys.stderr)
@@ -15,15 +15,21 @@ FastAPI application that:
 # =====================
 import os
 import sys
+import asyncio
 import time
 import json
 import re
+import heapq
+import functools
 import configparser
 import threading
+import selectors
 import subprocess
 from pathlib import Path
 from datetime import datetime
-from urllib.parse import unquote, urlsplit
+from email.utils import parsedate_to_datetime
+from operator import itemgetter
+from urllib.parse import quote, unquote, urlsplit
 from contextlib import asynccontextmanager
 
 
@@ -34,6 +40,7 @@ import psutil
 import requests
 import urllib3
 import uvicorn
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 
 from fastapi import FastAPI, Request, Query, Response
@@ -42,17 +49,33 @@ from fastapi.responses import (
     JSONResponse,
     RedirectResponse,
     PlainTextResponse,
+    StreamingResponse,
 )
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from starlette.background import BackgroundTask
 from starlette.responses import FileResponse
 
+try:
+    import orjson  # noqa: F401  (ORJSONResponse needs it at render time)
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+except ImportError:
+    FastJSONResponse = JSONResponse
+
 # =====================
 # Global setup
 # =====================
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# One keep-alive session for every ZM call (monitor list, montage snapshots) so
+# TCP/TLS connections are reused instead of re-handshaking on each request.
+ZM_SESSION = requests.Session()
+ZM_SESSION.verify = False
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)  # montage fetches snapshots in parallel
+ZM_SESSION.mount("http://", _adapter)
+ZM_SESSION.mount("https://", _adapter)
+
 ACCESS_LOG = False
 DEBUG_SUBPROCESS_OUTPUT = True
 
@@ -82,19 +105,16 @@ app.include_router(events_summary_router)
 async def lifespan(app: FastAPI):
     # -------- STARTUP --------
     print("🚀 Startup: launching background scripts")
-    for script_name in TARGET_SCRIPTS:
-        start_script_if_not_running(script_name)
+    scan_managed_processes()  # re-attach to scripts that outlived a previous run
+    await start_scripts(TARGET_SCRIPTS)
 
     yield  # app runs while paused here
 
     # -------- SHUTDOWN --------
     print("🛑 Shutdown: terminating background scripts")
-    for proc in psutil.process_iter(["pid", "cmdline"]):
+    for script_name in TARGET_SCRIPTS:
         try:
-            cmdline = proc.info.get("cmdline") or []
-            for part in cmdline:
-                if os.path.basename(part).lower() in TARGET_SCRIPTS:
-                    psutil.Process(proc.info["pid"]).terminate()
+            terminate_script(script_name)
         except Exception:
             continue
 
@@ -121,6 +141,7 @@ TARGET_SCRIPTS = [
 ]
 # Normalize to lowercase for process detection
 TARGET_SCRIPTS = [s.lower() for s in TARGET_SCRIPTS]
+TARGET_SCRIPT_SET = frozenset(TARGET_SCRIPTS)  # O(1) membership tests
 
 # =====================
 # Path / base directory
@@ -138,6 +159,13 @@ CONFIGURED_LOG_FILES = {
     for script in TARGET_SCRIPTS
 }
 
+# Map script -> psutil process we started (or re-attached to at startup).
+# Status checks and start/stop only look at these instead of scanning every process.
+MANAGED_PROCS: dict[str, psutil.Process] = {}
+# Held across the running-check, Popen and MANAGED_PROCS write, so two /start
+# requests at once can't both launch the same script.
+SCRIPT_START_LOCKS = {script: threading.Lock() for script in TARGET_SCRIPTS}
+
 
 # =====================
 # Configuration loading
@@ -181,6 +209,11 @@ def load_config(primary_file: str = "settings.ini",
     BAUTH_USER = config.get("credentials", "BAUTH_USER", fallback="")
     BAUTH_PWD = config.get("credentials", "BAUTH_PWD", fallback="")
     GO2RTC_HOST = config.get("general", "GO2RTC_HOST", fallback="").rstrip("/")
+    ZM_SESSION.auth = HTTPBasicAuth(BAUTH_USER, BAUTH_PWD)
+
+# Last parsed zm_token.json, keyed by the file's mtime
+SAVED_TOKEN: dict = {"mtime": None, "data": None}
+
 
 def get_saved_token() -> str | None:
     """
@@ -190,8 +223,13 @@ def get_saved_token() -> str | None:
     """
     token_file = os.path.join(os.path.dirname(__file__), "zm_token.json")
     try:
-        with open(token_file, encoding="utf-8") as f:
-            data = json.load(f)
+        # poll_zm_for_events.py rewrites the file on login; only re-parse when it changed
+        mtime = os.stat(token_file).st_mtime_ns
+        if SAVED_TOKEN["mtime"] != mtime:
+            with open(token_file, encoding="utf-8") as f:
+                SAVED_TOKEN["data"] = json.load(f)
+            SAVED_TOKEN["mtime"] = mtime
+        data = SAVED_TOKEN["data"]
         if data["expires"] > time.time():
             return data["token"]
     except Exception as e:
@@ -229,16 +267,12 @@ def safe_redirect(request: Request, endpoint: str, query: str = "") -> RedirectR
     return RedirectResponse(url + query, status_code=303)
 
 
-def get_detector_status() -> list[dict]:
+def scan_managed_processes() -> None:
     """
-    Return a list of background script status objects:
-        [
-          {"script": "poll_zm_for_events.py", "pid": 1234, "running": True, ...},
-          ...
-        ]
-    """
-    expected = {script: None for script in TARGET_SCRIPTS}
+    Scan all processes once and record any running target scripts in MANAGED_PROCS.
 
+    Only needed at startup, to pick up scripts left running by a previous instance.
+    """
     for proc in psutil.process_iter(["pid", "cmdline"]):
         try:
             cmdline = proc.info["cmdline"]
@@ -247,12 +281,56 @@ def get_detector_status() -> list[dict]:
 
             for part in cmdline:
                 script_name = os.path.basename(part).lower()
-                if script_name in expected:
-                    expected[script_name] = proc.info["pid"]
+                if script_name in TARGET_SCRIPT_SET:
+                    MANAGED_PROCS[script_name] = proc
         except Exception:
             # Ignore processes we can't introspect
             continue
 
+
+def get_managed_process(script_name: str) -> psutil.Process | None:
+    """
+    Return the live process for a script from MANAGED_PROCS, or None.
+
+    Exited processes are dropped from the table (our own children are reaped).
+    """
+    proc = MANAGED_PROCS.get(script_name)
+    if proc is None:
+        return None
+    try:
+        if isinstance(proc, psutil.Popen):
+            alive = proc.poll() is None
+        else:
+            # is_running() also guards against the PID having been reused
+            alive = proc.is_running() and proc.status() != psutil.STATUS_ZOMBIE
+    except psutil.Error:
+        alive = False
+    if not alive:
+        MANAGED_PROCS.pop(script_name, None)
+        return None
+    return proc
+
+
+def terminate_script(script_name: str) -> None:
+    """Send SIGTERM to a managed script if it is running."""
+    proc = get_managed_process(script_name)
+    if proc is not None:
+        proc.terminate()
+
+
+def get_detector_status() -> list[dict]:
+    """
+    Return a list of background script status objects:
+        [
+          {"script": "poll_zm_for_events.py", "pid": 1234, "running": True, ...},
+          ...
+        ]
+    """
+    expected = {}
+    for script in TARGET_SCRIPTS:
+        proc = get_managed_process(script)
+        expected[script] = proc.pid if proc else None
+
     now_str = datetime.now().strftime("%H:%M:%S")
     return [
         {
@@ -265,17 +343,113 @@ def get_detector_status() -> list[dict]:
     ]
 
 
+TAIL_BLOCK_BYTES = 4096
+
+
+def tail_log(path: str, lines: int) -> str:
+    """
+    Return the last `lines` lines of a log file, newest first.
+
+    Reads fixed-size blocks backwards from the end until enough lines are in hand,
+    so the cost depends on the tail length rather than the file size.
+    """
+    if lines <= 0:
+        return ""
+
+    with open(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        blocks: list[bytes] = []
+        newlines = 0
+        # One newline more than needed, so the (possibly partial) first line can be dropped
+        while pos > 0 and newlines <= lines:
+            size = min(TAIL_BLOCK_BYTES, pos)
+            pos -= size
+            f.seek(pos)
+            block = f.read(size)
+            blocks.append(block)
+            newlines += block.count(b"\n")
+
+    text = b"".join(reversed(blocks)).decode("utf-8", errors="replace").replace("\r\n", "\n")
+    tail = [line + "\n" for line in text.split("\n")]
+    if text.endswith("\n"):
+        tail.pop()  # split() leaves an empty string after the final newline
+    else:
+        tail[-1] = tail[-1][:-1]  # last line was not newline-terminated
+    tail = tail[-lines:]
+    tail.reverse()
+    return "".join(tail)
+
+
+# [link:url|label] markup written into the logs
+LINK_MARKUP_RE = re.compile(r"\[link:([^\|]+)\|([^\]]+)\]")
+
+
 def linkify(text: str) -> str:
     """
     Convert [link:url|label] markup into HTML <a> tags.
 
     This is used in logs to append a "View Full Log" link.
     """
-    return re.sub(
-        r"\[link:([^\|]+)\|([^\]]+)\]",
-        r'<a href="\1" target="_blank">\2</a>',
-        text,
-    )
+    return LINK_MARKUP_RE.sub(r'<a href="\1" target="_blank">\2</a>', text)
+
+
+# One thread forwards every child's output: pipes are non-blocking and multiplexed
+# with a selector (Windows can't select() on pipes, so it keeps a thread per pipe).
+OUTPUT_SELECTOR = selectors.DefaultSelector() if os.name != "nt" else None
+output_thread_lock = threading.Lock()
+output_thread: threading.Thread | None = None
+
+
+def print_child_line(label: str, line: bytes) -> None:
+    print(f"[{label}] {line.decode('utf-8', errors='replace').strip()}")
+
+
+def forward_output_loop() -> None:
+    """Read whatever is available on any registered pipe and print complete lines."""
+    while True:
+        for key, _ in OUTPUT_SELECTOR.select(timeout=1):
+            pipe, (label, pending) = key.fileobj, key.data
+            try:
+                chunk = os.read(pipe.fileno(), 65536)
+            except BlockingIOError:
+                continue
+            except OSError:
+                chunk = b""
+
+            if not chunk:
+                # Child closed the pipe: flush a trailing partial line and forget it
+                if pending:
+                    print_child_line(label, bytes(pending))
+                OUTPUT_SELECTOR.unregister(pipe)
+                pipe.close()
+                continue
+
+            pending += chunk
+            *lines, rest = pending.split(b"\n")
+            for line in lines:
+                print_child_line(label, line)
+            pending[:] = rest
+
+
+def forward_output(pipe, label: str) -> None:
+    """Echo a child's pipe to our console, one line at a time."""
+    global output_thread
+
+    if OUTPUT_SELECTOR is None:
+        def stream_output() -> None:
+            for line in iter(pipe.readline, b""):
+                print_child_line(label, line)
+            pipe.close()
+
+        threading.Thread(target=stream_output, daemon=True).start()
+        return
+
+    os.set_blocking(pipe.fileno(), False)
+    OUTPUT_SELECTOR.register(pipe, selectors.EVENT_READ, (label, bytearray()))
+    with output_thread_lock:
+        if output_thread is None:
+            output_thread = threading.Thread(target=forward_output_loop, daemon=True)
+            output_thread.start()
 
 
 def start_script_if_not_running(script_name: str) -> bool:
@@ -287,82 +461,79 @@ def start_script_if_not_running(script_name: str) -> bool:
         False if it was already running or failed to start
     """
     script_name = script_name.lower()
-    if script_name not in TARGET_SCRIPTS:
+    if script_name not in TARGET_SCRIPT_SET:
         return False
 
-    # Check if already running
-    for proc in psutil.process_iter(["cmdline"]):
+    with SCRIPT_START_LOCKS[script_name]:
+        # Check if already running
+        if get_managed_process(script_name) is not None:
+            return False
+
+        script_path = os.path.join(os.path.dirname(__file__), script_name)
         try:
-            cmdline = proc.info.get("cmdline") or []
-            for part in cmdline:
-                if os.path.basename(part).lower() == script_name:
-                    return False
-        except Exception:
-            continue
+            proc = psutil.Popen(  # type: ignore[attr-defined]
+                [sys.executable, "-u", script_path] + COMMON_SUBPROCESS_ARGS,
+                stdout=(subprocess.PIPE if DEBUG_SUBPROCESS_OUTPUT else subprocess.DEVNULL),  # type: ignore[name-defined]
+                stderr=(subprocess.PIPE if DEBUG_SUBPROCESS_OUTPUT else subprocess.DEVNULL),  # type: ignore[name-defined]
+                start_new_session=True,
+            )
+            MANAGED_PROCS[script_name] = proc
 
-    script_path = os.path.join(os.path.dirname(__file__), script_name)
-    try:
-        proc = psutil.Popen(  # type: ignore[attr-defined]
-            [sys.executable, "-u", script_path] + COMMON_SUBPROCESS_ARGS,
-            stdout=(subprocess.PIPE if DEBUG_SUBPROCESS_OUTPUT else subprocess.DEVNULL),  # type: ignore[name-defined]
-            stderr=(subprocess.PIPE if DEBUG_SUBPROCESS_OUTPUT else subprocess.DEVNULL),  # type: ignore[name-defined]
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            start_new_session=True,
-        )
+            if DEBUG_SUBPROCESS_OUTPUT:
+                # Stream stdout/stderr to the main console for easier debugging
+                forward_output(proc.stdout, f"{script_name} stdout")
+                forward_output(proc.stderr, f"{script_name} stderr")
 
-        if DEBUG_SUBPROCESS_OUTPUT:
-            # Stream stdout/stderr to the main console for easier debugging
-            def stream_output(pipe, label: str) -> None:
-                for line in iter(pipe.readline, ""):
-                    print(f"[{script_name} {label}] {line.strip()}")
-                pipe.close()
+            print(f"✅ Started {script_name}")
+            return True
+        except Exception as e:
+            print(f"⚠️ Failed to start {script_name}: {e}")
+            return False
 
-            threading.Thread(
-                target=stream_output, args=(proc.stdout, "stdout"), daemon=True
-            ).start()
-            threading.Thread(
-                target=stream_output, args=(proc.stderr, "stderr"), daemon=True
-            ).start()
 
-        print(f"✅ Started {script_name}")
-        return True
-    except Exception as e:
-        print(f"⚠️ Failed to start {script_name}: {e}")
-        return False
+# Last monitor list per token; a page load asks for it several times in a burst
+MONITORS_CACHE_TTL = 10.0
+MONITORS_CACHE: dict = {"ts": 0.0, "token": None, "data": None}
+MONITORS_LOCK = threading.Lock()  # concurrent misses wait for one upstream call
 
 
 def get_monitors(token: str) -> list[dict]:
     """
     Fetch the list of ZoneMinder monitors via the ZM API.
 
-    Only returns monitors that are actually decoding.
+    Only returns monitors that are actually decoding. Successful results are
+    cached for MONITORS_CACHE_TTL seconds per token.
     """
     if not ZM_HOST:
         print("❌ ZM_HOST is not configured")
         return []
 
-    url = f"{ZM_HOST}/zm/api/monitors.json?token={token}"
-    try:
-        response = requests.get(
-            url,
-            auth=HTTPBasicAuth(BAUTH_USER, BAUTH_PWD),
-            verify=False,
-            timeout=10,
-        )
-        if response.ok:
-            monitors = response.json().get("monitors", [])
-            # Keep only monitors that are decoding
-            return [
-                m
-                for m in monitors
-                if m.get("Monitor", {}).get("Decoding") != "None"
-            ]
-        print(f"❌ Failed to fetch monitors: {response.status_code} {response.text}")
-    except Exception as e:
-        print(f"❌ Error contacting ZM API: {e}")
-    return []
+    with MONITORS_LOCK:
+        if (
+            MONITORS_CACHE["token"] == token
+            and time.monotonic() - MONITORS_CACHE["ts"] < MONITORS_CACHE_TTL
+        ):
+            return MONITORS_CACHE["data"]
+
+        url = f"{ZM_HOST}/zm/api/monitors.json?token={token}"
+        try:
+            response = ZM_SESSION.get(url, timeout=10)
+            if response.ok:
+                monitors = response.json().get("monitors", [])
+                # Keep only monitors that are decoding
+                decoding = [
+                    m
+                    for m in monitors
+                    if m.get("Monitor", {}).get("Decoding") != "None"
+                ]
+                MONITORS_CACHE.update(ts=time.monotonic(), token=token, data=decoding)
+                return decoding
+            if response.status_code in (401, 403):
+                MONITORS_CACHE.update(ts=0.0, token=None, data=None)
+            print(f"❌ Failed to fetch monitors: {response.status_code} {response.text}")
+        except Exception as e:
+            print(f"❌ Error contacting ZM API: {e}")
+        return []
 
 def zm_button_url(request: Request) -> str:
     """
@@ -401,6 +572,50 @@ async def zm_export_page(request: Request):
     return templates.TemplateResponse("zm_export.html", {"request": request})
 
 
+# Dashboard's newest-N listing, reused while the directory is unchanged (same rules as DETECTIONS_CACHE)
+NEWEST_DETECTIONS_CACHE: dict = {"mtime": None, "ts": 0.0, "count": 0, "files": []}
+
+
+def newest_detections(count: int) -> list[str]:
+    """Return the `count` most recently modified files in ZM_AI_DETECTIONS_DIR, newest first."""
+    try:
+        dir_mtime = os.stat(ZM_AI_DETECTIONS_DIR).st_mtime_ns
+    except FileNotFoundError:
+        return []
+    now = time.monotonic()
+    cached = NEWEST_DETECTIONS_CACHE
+    if (
+        cached["mtime"] == dir_mtime
+        and cached["count"] == count
+        and now - cached["ts"] < DETECTIONS_CACHE_TTL
+    ):
+        return cached["files"]
+
+    # stat() each file once
+    with os.scandir(ZM_AI_DETECTIONS_DIR) as it:
+        entries = [(e.name, e.stat().st_mtime) for e in it if e.is_file()]
+    files = [f for f, _ in heapq.nlargest(count, entries, key=itemgetter(1))]
+    NEWEST_DETECTIONS_CACHE.update(mtime=dir_mtime, ts=now, count=count, files=files)
+    return files
+
+
+def read_log_tails(lines: int) -> dict[str, str | None]:
+    """Tail every script log; None for logs that don't exist yet."""
+    return {
+        name: tail_log(path, lines) if os.path.exists(path) else None
+        for name, path in CONFIGURED_LOG_FILES.items()
+    }
+
+
+def read_log_file(log_path: str) -> str | None:
+    """Return a whole log file, or None if it doesn't exist."""
+    try:
+        with open(log_path, "r", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
     """
@@ -412,39 +627,28 @@ async def index(request: Request):
     saved = request.query_params.get("saved")
     scheme = get_request_scheme(request)
 
+    # Directory scan and log reads run in a worker thread, off the event loop
+    newest, tails = await asyncio.to_thread(
+        lambda: (newest_detections(25), read_log_tails(DEFAULT_LOG_TAIL_LINES))
+    )
+
     # Build thumbnail list (latest 25)
-    if os.path.exists(ZM_AI_DETECTIONS_DIR):
-        thumbs = [
-            {
-                "filename": f,
-                "url": f"{scheme}://{request.url.netloc}"
-                f"{request.url_for('serve_detected_frame', filename=f).path}",
-            }
-            for f in sorted(
-                (
-                    f
-                    for f in os.listdir(ZM_AI_DETECTIONS_DIR)
-                    if os.path.isfile(os.path.join(ZM_AI_DETECTIONS_DIR, f))
-                ),
-                key=lambda f: os.path.getmtime(
-                    os.path.join(ZM_AI_DETECTIONS_DIR, f)
-                ),
-                reverse=True,
-            )[:25]
-        ]
-    else:
-        thumbs = []
+    thumbs = [
+        {
+            "filename": f,
+            "url": f"{scheme}://{request.url.netloc}"
+            f"{request.url_for('serve_detected_frame', filename=f).path}",
+            "thumb_url": f"{scheme}://{request.url.netloc}"
+            f"{request.url_for('serve_detected_thumb', filename=f).path}",
+        }
+        for f in newest
+    ]
 
     # Tail logs for each script
     logs: dict[str, str] = {}
     for name in TARGET_SCRIPTS:
-        path = CONFIGURED_LOG_FILES.get(name)
-        if path and os.path.exists(path):
-            with open(path, "r", encoding="utf-8") as f:
-                lines = f.readlines()[-DEFAULT_LOG_TAIL_LINES:]
-            lines.reverse()
-            content = "".join(lines)
-
+        content = tails.get(name)
+        if content is not None:
             full_log_url = (
                 f"{scheme}://{request.url.netloc}"
                 f"{request.url_for('log_full_by_name', script_name=name).path}"
@@ -479,6 +683,66 @@ async def gallery(request: Request):
     return templates.TemplateResponse("gallery.html", {"request": request})
 
 
+# Parsed settings.ini for the edit form, reused until the file's mtime changes.
+# Read without interpolation so values (e.g. passwords with "%") round-trip verbatim.
+SETTINGS_FORM_CACHE: dict = {"mtime": None, "parser": None, "settings": {}}
+
+
+def read_settings_parser(config_path: str) -> configparser.ConfigParser | None:
+    """Return the raw (interpolation-free) parser for settings.ini, re-parsing only when it changed."""
+    try:
+        mtime = os.stat(config_path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if SETTINGS_FORM_CACHE["mtime"] != mtime:
+        # No real default section: [DEFAULT] parses as an ordinary section, so each
+        # section yields only its own keys and [DEFAULT] is still written back
+        parser = configparser.ConfigParser(interpolation=None, default_section="\x00")
+        parser.read(config_path)
+        SETTINGS_FORM_CACHE["parser"] = parser
+        SETTINGS_FORM_CACHE["settings"] = {
+            section: dict(parser[section])
+            for section in parser.sections() if section != configparser.DEFAULTSECT
+        }
+        SETTINGS_FORM_CACHE["mtime"] = mtime
+    return SETTINGS_FORM_CACHE["parser"]
+
+
+def read_settings_for_form(config_path: str) -> dict[str, dict[str, str]]:
+    """Return {section: {key: value}} for settings.ini, re-parsing only when it changed."""
+    if read_settings_parser(config_path) is None:
+        return {}
+    return SETTINGS_FORM_CACHE["settings"]
+
+
+settings_write_lock = threading.Lock()  # one read-modify-write of settings.ini at a time
+
+
+def write_settings(config_path: str, form_items: list[tuple[str, str]]) -> None:
+    """Apply section__key form values to settings.ini, replacing the file atomically."""
+    with settings_write_lock:
+        # Fresh copy of the cached parse (the cache itself stays untouched); [DEFAULT]
+        # is an ordinary section there, so it is carried over like any other
+        parser = configparser.ConfigParser(interpolation=None, default_section="\x00")
+        cached = read_settings_parser(config_path)
+        if cached is not None:
+            parser.read_dict({section: cached[section] for section in cached.sections()})
+
+        for full_key, value in form_items:
+            if "__" in full_key:
+                section, key = full_key.split("__", 1)
+                if section not in parser:
+                    parser.add_section(section)
+                parser[section][key] = value
+
+        # Write next to the original and swap it in, so a crash never leaves a half-written file
+        tmp_path = config_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            parser.write(f)
+        os.replace(tmp_path, config_path)
+        SETTINGS_FORM_CACHE["mtime"] = None  # mtime granularity can hide a quick re-save
+
+
 @app.get("/edit_settings", response_class=HTMLResponse, name="edit_settings")
 async def edit_settings_get(request: Request):
     """
@@ -487,9 +751,7 @@ async def edit_settings_get(request: Request):
     Each input name uses section__key convention (e.g. general__ZM_HOST).
     """
     config_path = os.path.join(BASE_PATH, "settings.ini")
-    parser = configparser.ConfigParser()
-    parser.read(config_path)
-    settings = {section: dict(parser[section]) for section in parser.sections()}
+    settings = read_settings_for_form(config_path)
     return templates.TemplateResponse(
         "edit_settings.html", {"request": request, "config": settings}
     )
@@ -504,18 +766,7 @@ async def edit_settings_post(request: Request):
     """
     form_data = await request.form()
     config_path = os.path.join(BASE_PATH, "settings.ini")
-    parser = configparser.ConfigParser()
-    parser.read(config_path)
-
-    for full_key, value in form_data.items():
-        if "__" in full_key:
-            section, key = full_key.split("__", 1)
-            if section not in parser:
-                parser.add_section(section)
-            parser[section][key] = value
-
-    with open(config_path, "w", encoding="utf-8") as f:
-        parser.write(f)
+    await asyncio.to_thread(write_settings, config_path, list(form_data.items()))
 
     # Reload globals
     load_config()
@@ -527,6 +778,15 @@ async def edit_settings_post(request: Request):
 # Routes: Logs
 # =====================
 
+@functools.lru_cache(maxsize=32)
+def log_full_links(scheme: str, netloc: str) -> dict[str, str]:
+    """"View Full Log" link markup per script; only depends on the host the UI is reached through."""
+    return {
+        name: f"\n[link:{scheme}://{netloc}/zm_ai/log_full_by_name/{name}|🔍View Full Log]"
+        for name in CONFIGURED_LOG_FILES
+    }
+
+
 @app.get("/get_logs")
 async def get_logs(request: Request, lines: int = DEFAULT_LOG_TAIL_LINES):
     """
@@ -534,23 +794,17 @@ async def get_logs(request: Request, lines: int = DEFAULT_LOG_TAIL_LINES):
 
     Designed for the frontend to periodically poll and update log panels.
     """
-    scheme = get_request_scheme(request)
-    netloc = request.url.netloc
+    links = log_full_links(get_request_scheme(request), request.url.netloc)
 
-    logs: dict[str, str] = {}
-    for name, path in CONFIGURED_LOG_FILES.items():
-        if os.path.exists(path):
-            with open(path, "r", encoding="utf-8") as f:
-                lines_data = f.readlines()[-lines:]
-            lines_data.reverse()
-            content = "".join(lines_data)
+    tails = await asyncio.to_thread(read_log_tails, lines)
 
-            full_url = f"{scheme}://{netloc}/zm_ai/log_full_by_name/{name}"
-            content += f"\n[link:{full_url}|🔍View Full Log]"
-            logs[name] = linkify(content)
+    logs: dict[str, str] = {}
+    for name, content in tails.items():
+        if content is not None:
+            logs[name] = linkify(content + links[name])
         else:
             logs[name] = "No log file found."
-    return JSONResponse(logs)
+    return FastJSONResponse(logs)
 
 
 @app.get("/log_full/{index}", response_class=PlainTextResponse)
@@ -563,11 +817,10 @@ async def log_full(index: int):
         return PlainTextResponse("Invalid script index", status_code=404)
 
     log_path = CONFIGURED_LOG_FILES[script_keys[index]]
-    if not os.path.exists(log_path):
+    content = await asyncio.to_thread(read_log_file, log_path)
+    if content is None:
         return PlainTextResponse("Log file not found", status_code=404)
-
-    with open(log_path, "r", encoding="utf-8") as f:
-        return PlainTextResponse(f.read())
+    return PlainTextResponse(content)
 
 
 @app.get("/log_full_by_name/{script_name}", response_class=PlainTextResponse)
@@ -576,40 +829,36 @@ async def log_full_by_name(script_name: str):
     Return full log contents for a script by file name.
     """
     log_path = CONFIGURED_LOG_FILES.get(script_name)
-    if not log_path or not os.path.exists(log_path):
+    content = await asyncio.to_thread(read_log_file, log_path) if log_path else None
+    if content is None:
         return PlainTextResponse("Log file not found", status_code=404)
-
-    with open(log_path, "r", encoding="utf-8") as f:
-        return PlainTextResponse(f.read())
+    return PlainTextResponse(content)
 
 
 # =====================
 # Routes: Background script control
 # =====================
 
+async def start_scripts(script_names: list[str]) -> None:
+    """Start several scripts at once; each Popen (fork/exec) runs in its own worker thread."""
+    await asyncio.gather(
+        *(asyncio.to_thread(start_script_if_not_running, name) for name in script_names)
+    )
+
+
 @app.post("/start", name="start")
 async def start_all_scripts(request: Request):
     """Start all target scripts."""
-    for script in TARGET_SCRIPTS:
-        start_script_if_not_running(script)
+    await start_scripts(TARGET_SCRIPTS)
     return safe_redirect(request, "index")
 
 
 @app.post("/stop", name="stop")
 async def stop_all_scripts(request: Request):
-    """Stop all target scripts by scanning processes and terminating matches."""
-    for proc in psutil.process_iter(["pid", "cmdline"]):
+    """Stop all target scripts by terminating their managed processes."""
+    for target in TARGET_SCRIPTS:
         try:
-            cmdline = proc.info.get("cmdline")
-            if not cmdline:
-                continue
-
-            for part in cmdline:
-                part_basename = os.path.basename(part).lower()
-                for target in TARGET_SCRIPTS:
-                    if part_basename == target:
-                        psutil.Process(proc.info["pid"]).terminate()
-                        break
+            terminate_script(target)
         except Exception as e:
             print(f"⚠️ Error stopping process: {e}")
     return safe_redirect(request, "index")
@@ -618,7 +867,7 @@ async def stop_all_scripts(request: Request):
 @app.post("/start/{script_name}")
 async def start_script(script_name: str, request: Request):
     """Start a single script by name (if valid and not already running)."""
-    if script_name not in TARGET_SCRIPTS:
+    if script_name not in TARGET_SCRIPT_SET:
         return PlainTextResponse("Invalid script", status_code=400)
 
     start_script_if_not_running(script_name)
@@ -628,18 +877,13 @@ async def start_script(script_name: str, request: Request):
 @app.post("/stop/{script_name}")
 async def stop_script(script_name: str, request: Request):
     """Stop a single script by name."""
-    if script_name not in TARGET_SCRIPTS:
+    if script_name not in TARGET_SCRIPT_SET:
         return PlainTextResponse("Invalid script", status_code=400)
 
-    for proc in psutil.process_iter(["pid", "cmdline"]):
-        try:
-            cmdline = proc.info.get("cmdline") or []
-            for part in cmdline:
-                if os.path.basename(part).lower() == script_name.lower():
-                    psutil.Process(proc.info["pid"]).terminate()
-                    break
-        except Exception as e:
-            print(f"⚠️ Error stopping {script_name}: {e}")
+    try:
+        terminate_script(script_name.lower())
+    except Exception as e:
+        print(f"⚠️ Error stopping {script_name}: {e}")
 
     return safe_redirect(request, "index")
 
@@ -648,6 +892,46 @@ async def stop_script(script_name: str, request: Request):
 # Routes: Detected images
 # =====================
 
+# Newest-first listing of ZM_AI_DETECTIONS_DIR, reused while the directory is unchanged.
+# The short TTL covers files rewritten in place, which don't touch the directory mtime.
+DETECTIONS_CACHE: dict = {"mtime": None, "ts": 0.0, "files": []}
+DETECTIONS_CACHE_TTL = 2.0
+IMAGE_EXTS = frozenset({".jpg", ".jpeg", ".png", ".gif"})
+detections_cache_lock = threading.Lock()
+
+
+def list_detections() -> list[str]:
+    """Return detected image filenames sorted newest-first."""
+    dir_mtime = os.stat(ZM_AI_DETECTIONS_DIR).st_mtime_ns
+    now = time.monotonic()
+    with detections_cache_lock:
+        if (
+            DETECTIONS_CACHE["mtime"] == dir_mtime
+            and now - DETECTIONS_CACHE["ts"] < DETECTIONS_CACHE_TTL
+        ):
+            return DETECTIONS_CACHE["files"]
+
+    # One directory pass; DirEntry.stat() is the only stat per file
+    with os.scandir(ZM_AI_DETECTIONS_DIR) as it:
+        entries = [
+            (e.name, e.stat().st_mtime)
+            for e in it
+            if os.path.splitext(e.name)[1].lower() in IMAGE_EXTS and e.is_file()
+        ]
+    entries.sort(key=itemgetter(1), reverse=True)
+    files = [f for f, _ in entries]
+
+    with detections_cache_lock:
+        DETECTIONS_CACHE.update(mtime=dir_mtime, ts=now, files=files)
+    return files
+
+
+def invalidate_detections_cache() -> None:
+    with detections_cache_lock:
+        DETECTIONS_CACHE["mtime"] = None
+    NEWEST_DETECTIONS_CACHE["mtime"] = None
+
+
 @app.get("/get_images", name="get_images")
 async def get_images(request: Request):
     """
@@ -656,33 +940,59 @@ async def get_images(request: Request):
     Front-end uses this for thumbnail grid updates.
     """
     try:
-        if not os.path.exists(ZM_AI_DETECTIONS_DIR):
-            return JSONResponse([])
-
-        files = [
-            f
-            for f in os.listdir(ZM_AI_DETECTIONS_DIR)
-            if f.lower().endswith((".jpg", ".jpeg", ".png", ".gif"))
-        ]
-        files.sort(
-            key=lambda f: os.path.getmtime(os.path.join(ZM_AI_DETECTIONS_DIR, f)),
-            reverse=True,
-        )
+        try:
+            files = await asyncio.to_thread(list_detections)
+        except FileNotFoundError:  # folder removed while running (created at startup)
+            return FastJSONResponse([])
 
+        # Resolve the route once and append each (quoted) filename to it
         scheme = get_request_scheme(request)
-        urls = [
-            f"{scheme}://{request.url.netloc}"
-            f"{request.url_for('serve_detected_frame', filename=f).path}"
-            for f in files
-        ]
+        route = request.url_for("serve_detected_frame", filename="_").path[:-1]
+        prefix = f"{scheme}://{request.url.netloc}{route}"
+        urls = [prefix + quote(f) for f in files]
 
-        return JSONResponse(urls)
+        return FastJSONResponse(urls)
     except BrokenPipeError:
         # Client closed connection mid-response
         print("⚠️ Broken pipe in get_images — client likely disconnected early")
         return PlainTextResponse("Client disconnected", status_code=499)
 
 
+DELETE_CONCURRENCY = 16  # os.remove calls in flight per delete_images request
+
+
+def is_plain_filename(filename: str) -> bool:
+    """Reject anything that could step outside the detections folder."""
+    return filename not in ("", ".", "..") and os.path.basename(filename) == filename
+
+
+def delete_detection(url: str) -> bool:
+    """Remove the detected image (and its thumbnail) named by `url`; True if it was deleted."""
+    filename = urlsplit(url).path.rsplit("/", 1)[-1]  # ignores any ?query / #fragment
+    if "%" in filename:  # most names are plain ASCII and need no decoding
+        filename = unquote(filename)
+    abs_path = os.path.realpath(os.path.join(ZM_AI_DETECTIONS_DIR, filename))
+
+    # Only plain files directly inside the detections folder ("..", separators and
+    # symlinks pointing elsewhere are refused)
+    if not is_plain_filename(filename) or \
+            os.path.dirname(abs_path) != os.path.realpath(ZM_AI_DETECTIONS_DIR):
+        print(f"Refusing to delete {url}: outside {ZM_AI_DETECTIONS_DIR}")
+        return False
+
+    try:
+        os.remove(abs_path)
+    except Exception as e:
+        print(f"Failed to delete {url}: {e}")
+        return False
+
+    try:
+        os.remove(os.path.join(ZM_AI_DETECTIONS_DIR, "thumbs", filename))
+    except OSError:
+        pass  # older detections have no thumbnail
+    return True
+
+
 @app.post("/delete_images", name="delete_images")
 async def delete_images(request: Request):
     """
@@ -693,28 +1003,83 @@ async def delete_images(request: Request):
     """
     data = await request.json()
     urls = data.get("urls", [])
-    deleted = []
 
-    for url in urls:
-        filename = unquote(url.split("/")[-1])
-        abs_path = os.path.join(ZM_AI_DETECTIONS_DIR, filename)
+    # Removals run in worker threads, a bounded number at a time
+    sem = asyncio.Semaphore(DELETE_CONCURRENCY)
 
-        try:
-            os.remove(abs_path)
-            deleted.append(url)
-        except Exception as e:
-            print(f"Failed to delete {url}: {e}")
+    async def remove(url: str) -> bool:
+        async with sem:
+            return await asyncio.to_thread(delete_detection, url)
 
+    results = await asyncio.gather(*(remove(url) for url in urls))
+    deleted = [url for url, ok in zip(urls, results) if ok]
+
+    if deleted:
+        invalidate_detections_cache()
     return JSONResponse({"deleted": deleted})
 
 
-@app.get("/detected_frames/{filename}", name="serve_detected_frame")
-async def serve_detected_frame(filename: str):
+# Detected frames never change once written, so grid refreshes can revalidate with a 304
+DETECTED_FRAME_CACHE_CONTROL = "public, max-age=60"
+
+
+def is_not_modified(request: Request, st: os.stat_result, etag: str) -> bool:
+    """True if the client's cached copy (If-None-Match / If-Modified-Since) is still current."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+        return if_none_match.strip() == "*" or etag in (
+            tag.strip() for tag in if_none_match.split(",")
+        )
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(st.st_mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            pass
+    return False
+
+
+def detected_file_response(request: Request, abs_path: str) -> Response | None:
+    """FileResponse for abs_path with ETag/Last-Modified, a 304 if unchanged, or None if missing."""
+    try:
+        st = os.stat(abs_path)
+    except FileNotFoundError:
+        return None
+
+    etag = f'W/"{st.st_mtime_ns:x}-{st.st_size:x}"'
+    headers = {"ETag": etag, "Cache-Control": DETECTED_FRAME_CACHE_CONTROL}
+    if is_not_modified(request, st, etag):
+        return Response(status_code=304, headers=headers)
+    headers["Accept-Ranges"] = "bytes"
+    # Hand over our stat so FileResponse doesn't stat the file again
+    return FileResponse(abs_path, headers=headers, stat_result=st)
+
+
+@app.api_route("/detected_frames/{filename}", methods=["GET", "HEAD"], name="serve_detected_frame")
+async def serve_detected_frame(filename: str, request: Request):
     """Serve a detected frame file by filename."""
-    abs_path = os.path.join(ZM_AI_DETECTIONS_DIR, filename)
-    if not os.path.exists(abs_path):
+    response = None
+    if is_plain_filename(filename):
+        response = detected_file_response(
+            request, os.path.join(ZM_AI_DETECTIONS_DIR, filename)
+        )
+    if response is None:
         return JSONResponse({"error": "Not found"}, status_code=404)
-    return FileResponse(abs_path)
+    return response
+
+
+@app.api_route("/detected_frames/thumbs/{filename}", methods=["GET", "HEAD"], name="serve_detected_thumb")
+async def serve_detected_thumb(filename: str, request: Request):
+    """Serve the downscaled thumbnail of a detected frame, or the frame itself if there is none."""
+    if not is_plain_filename(filename):
+        return JSONResponse({"error": "Not found"}, status_code=404)
+    response = detected_file_response(
+        request, os.path.join(ZM_AI_DETECTIONS_DIR, "thumbs", filename)
+    )
+    if response is None:
+        return await serve_detected_frame(filename, request)
+    return response
 
 
 # =====================
@@ -724,7 +1089,7 @@ async def serve_detected_frame(filename: str):
 @app.get("/get_status")
 async def get_status():
     """Return JSON status for all background scripts."""
-    return JSONResponse(get_detector_status())
+    return FastJSONResponse(get_detector_status())
 
 
 @app.get("/debug_headers")
@@ -734,7 +1099,7 @@ async def debug_headers(request: Request):
 
     Useful while tuning reverse proxy / TLS / forwarding configuration.
     """
-    return JSONResponse(dict(request.headers))
+    return FastJSONResponse(dict(request.headers))
 
 
 # =====================
@@ -753,7 +1118,7 @@ async def camera_montage_snapshot(request: Request):
         return HTMLResponse("❌ No valid access token found", status_code=503)
 
     scheme = get_request_scheme(request)
-    all_monitors = get_monitors(token)
+    all_monitors = await asyncio.to_thread(get_monitors, token)  # don't block the event loop on ZM
 
     cameras = []
     for m in all_monitors:
@@ -795,20 +1160,22 @@ def montage_snapshot_proxy(cam_id: int, scale: int = Query(100)):
         f"&token={token}"
     )
 
-    r = requests.get(
+    r = ZM_SESSION.get(
         zm_url,
-        auth=HTTPBasicAuth(BAUTH_USER, BAUTH_PWD),
-        verify=False,
         timeout=10,
         headers={"User-Agent": "FastAPI Snapshot Proxy"},
+        stream=True,
     )
 
     if not r.ok:
+        r.close()
         return HTMLResponse("❌ Snapshot failed", status_code=502)
 
-    return Response(
-        content=r.content,
+    # Relay the JPEG chunk by chunk; the connection goes back to the pool once it is sent
+    return StreamingResponse(
+        r.iter_content(chunk_size=65536),
         media_type=r.headers.get("Content-Type", "image/jpeg"),
+        background=BackgroundTask(r.close),
     )
 
 
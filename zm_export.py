@@ -12,16 +12,53 @@
 #  - Counter is a tiny JSON file under ./temp; best-effort writes.
 # -----------------------------------------------------------------------------
 
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Query, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from typing import Optional, Dict, Any, List
 from pathlib import Path
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
-import json, re, subprocess, shutil
-import time, math
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from urllib.parse import quote
+import os, json, re, subprocess, shutil, selectors, threading, asyncio
+import time, functools, glob, struct, heapq, operator
+
+try:
+    import orjson  # C encoder/decoder for the polled counter files
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+    def _json_dumps(obj):
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+try:
+    import av  # PyAV: probe durations in-process instead of spawning ffprobe
+except ImportError:
+    av = None
+
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:  # not Linux / not installed: the concat index rescans temp/ per request
+    INotify = None
 
 router = APIRouter()
 
+# PATH lookups done once at import (shutil.which stats every PATH entry);
+# commands below run these absolute paths, so no launch repeats the search
+_FFMPEG = shutil.which("ffmpeg")
+_FFPROBE = shutil.which("ffprobe")
+
+# Keep-alive session for ZM API lookups; per-monitor requests run in parallel on it
+_ZM_SESSION = requests.Session()
+_ZM_SESSION.verify = False
+_zm_adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32)
+_ZM_SESSION.mount("http://", _zm_adapter)
+_ZM_SESSION.mount("https://", _zm_adapter)
+_ZM_FETCH_WORKERS = 16
+
 # =============================================================================
 # Small helpers (IDs, counter/progress files)  
 # =============================================================================
@@ -29,16 +66,32 @@ from pathlib import Path
 from typing import Optional
 import json, re, subprocess
 
+_SAFE_ID_RE = re.compile(r"[^A-Za-z0-9._-]+")
+_DELETE_BASE_RE = re.compile(r"\A(?:concat_)?(?P<suffix>[A-Za-z0-9._-]{1,200}?)(?:\.mp4|\.json)?\Z")
+
 def _safe_id(s: Optional[str]) -> str:
     """Make a filesystem-safe identifier from arbitrary text."""
-    return re.sub(r"[^A-Za-z0-9._-]+", "-", (s or "")).strip("-")
+    return _SAFE_ID_RE.sub("-", (s or "")).strip("-")
 
+def _response_json(r: requests.Response) -> Any:
+    """Decode a ZM API response body (orjson when available; r.json() for non-UTF-8 bodies)."""
+    try:
+        return _json_loads(r.content) if r.content else None
+    except ValueError:
+        return r.json()
+
+@functools.lru_cache(maxsize=1)
 def _default_temp_dir() -> Path:
+    """./temp next to this file; resolved and created once, then reused (hot in the progress loop)."""
     root = Path(__file__).resolve().parent
     t = root / "temp"
     t.mkdir(parents=True, exist_ok=True)
     return t
 
+_TEMP_URL_PREFIX = "/zm_ai/temp/"  # where zm_ai serves _default_temp_dir()
+_CONCAT_PREFIX = "concat_"
+_EVENTS_PREFIX = "events_"
+
 def _counter_path(job_id: str, temp_dir: Optional[Path] = None) -> Path:
     """
     Path to the JSON counter file for a given job_id.
@@ -47,6 +100,12 @@ def _counter_path(job_id: str, temp_dir: Optional[Path] = None) -> Path:
     tdir = temp_dir or _default_temp_dir()
     return tdir / f"counter_{_safe_id(job_id)}.json"
 
+@functools.lru_cache(maxsize=128)
+def _counter_paths(job_id: str, temp_dir: Optional[Path] = None) -> tuple[str, str]:
+    """(counter, tmp) path strings for a job, built once instead of on every write."""
+    p = _counter_path(job_id, temp_dir)
+    return str(p), str(p.with_suffix(".tmp"))
+
 def _progress_txt_path(job_id: Optional[str], temp_dir: Optional[Path] = None) -> Optional[Path]:
     """
     Path to ffmpeg -progress text file for concat, or None if no job_id.
@@ -57,6 +116,13 @@ def _progress_txt_path(job_id: Optional[str], temp_dir: Optional[Path] = None) -
     tdir = temp_dir or _default_temp_dir()
     return tdir / f"concat_progress_{_safe_id(job_id)}.txt"
 
+# Last snapshot per counter file, {path: (st_mtime_ns, data)}; filled by _counter_write
+# so /events/download_counter polls only stat() the file while this process writes it
+_COUNTER_CACHE: Dict[str, tuple[int, dict]] = {}
+
+# O_BINARY keeps Windows from translating newlines in os.write
+_COUNTER_OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
 def _counter_write(
     job_id: Optional[str],
     data: dict,
@@ -71,27 +137,32 @@ def _counter_write(
     if not job_id:
         return
     try:
+        # One copy of the caller's dict, then fill it in place
+        data = dict(data)
+
         # Ensure required fields exist
-        if "phase" not in data:
-            data = {**data, "phase": "download"}
-        if "status" not in data:
-            data = {**data, "status": "running"}
+        data.setdefault("phase", "download")
+        data.setdefault("status", "running")
 
-        # Inject want_concat if caller provided it (so UI can be consistent)
+        # Inject want_concat if caller provided it (so UI can be consistent);
+        # otherwise preserve if already present, default False
         if want_concat is not None:
-            data = {**data, "want_concat": bool(want_concat)}
-        else:
-            # preserve if already present; default False otherwise
-            data = {**data, "want_concat": bool(data.get("want_concat", False))}
+            data["want_concat"] = bool(want_concat)
 
         # Add continuous overall fields
-        data = _with_overall_fields(data)
+        _add_overall_fields(data)
 
-        # Atomic write to avoid transient truncation reads
-        p = _counter_path(job_id, temp_dir)
-        tmp = p.with_suffix(".tmp")
-        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
-        tmp.replace(p)
+        # Atomic write to avoid transient truncation reads; raw fd calls, no file object.
+        # Best-effort progress, so no fsync.
+        p_s, tmp_s = _counter_paths(job_id, temp_dir)
+        fd = os.open(tmp_s, _COUNTER_OPEN_FLAGS, 0o644)
+        try:
+            os.write(fd, _json_dumps(data))
+            mtime = os.fstat(fd).st_mtime_ns  # rename keeps it, so it matches stat(p) below
+        finally:
+            os.close(fd)
+        os.replace(tmp_s, p_s)
+        _COUNTER_CACHE[p_s] = (mtime, data)  # pollers read this instead of the file
     except Exception:
         pass  # non-fatal
 
@@ -100,26 +171,151 @@ def _counter_clear(job_id: Optional[str], temp_dir: Optional[Path] = None) -> No
     """Remove the counter file when completely done (optional)."""
     if not job_id:
         return
+    p_s, _ = _counter_paths(job_id, temp_dir)
+    _COUNTER_CACHE.pop(p_s, None)
     try:
-        _counter_path(job_id, temp_dir).unlink()
+        os.unlink(p_s)
     except Exception:
         pass
 
-def _ffprobe_duration_seconds(path: Path) -> Optional[float]:
-    """Return duration (seconds) of a media file using ffprobe, or None."""
+def _mp4_box_header(f) -> Optional[tuple[bytes, int, int]]:
+    """Read one ISO-BMFF box header at the current offset: (type, body_size, header_size)."""
+    hdr = f.read(8)
+    if len(hdr) < 8:
+        return None
+    size, box_type = struct.unpack(">I4s", hdr)
+    if size == 1:  # 64-bit largesize follows
+        ext = f.read(8)
+        if len(ext) < 8:
+            return None
+        return box_type, struct.unpack(">Q", ext)[0] - 16, 16
+    if size == 0:  # box runs to end of file
+        pos = f.tell()
+        end = f.seek(0, os.SEEK_END)
+        f.seek(pos)
+        return box_type, end - pos, 8
+    return box_type, size - 8, 8
+
+def _mp4_mvhd_duration(path: Path | str) -> Optional[float]:
+    """
+    Movie duration straight from moov/mvhd (timescale + duration), or None when the
+    file isn't a plain mp4 or doesn't say (e.g. fragmented mp4 with duration 0).
+    Only box headers are read, wherever the moov sits in the file.
+    """
+    try:
+        with open(path, "rb") as f:
+            end = os.fstat(f.fileno()).st_size
+            limit = end
+            while f.tell() + 8 <= limit:
+                box = _mp4_box_header(f)
+                if box is None:
+                    return None
+                box_type, body, _ = box
+                if body < 0:
+                    return None
+                if box_type == b"moov":
+                    limit = f.tell() + body  # descend: walk moov's children
+                    continue
+                if box_type == b"mvhd":
+                    version = f.read(4)[0]
+                    if version == 1:
+                        timescale, duration = struct.unpack(">16xIQ", f.read(28))
+                        unknown = 0xFFFFFFFFFFFFFFFF
+                    else:
+                        timescale, duration = struct.unpack(">8xII", f.read(16))
+                        unknown = 0xFFFFFFFF
+                    if not timescale or not duration or duration == unknown:
+                        return None
+                    return duration / timescale
+                f.seek(body, os.SEEK_CUR)
+    except (OSError, struct.error, IndexError):
+        pass
+    return None
+
+def _ffprobe_duration_seconds(path: Path | str) -> Optional[float]:
+    """
+    Return duration (seconds) of a media file, or None. Tries the cheapest source
+    first: the mp4 mvhd header, then PyAV in-process, then the ffprobe binary.
+    """
+    d = _mp4_mvhd_duration(path)  # header read only: no decoder, no fork
+    if d:
+        return d
+    if av is not None:
+        # In-process probe: no ffprobe fork/exec per file
+        try:
+            with av.open(str(path), metadata_errors="ignore") as c:
+                if c.duration:
+                    return c.duration / av.time_base
+        except Exception:
+            pass  # fall through to the ffprobe binary
+    if _FFPROBE is None:
+        return None
     try:
         res = subprocess.run(
-            ["ffprobe","-v","error","-select_streams","v:0",
-             "-show_entries","format=duration","-of","default=nw=1:nk=1", str(path)],
-            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+            [_FFPROBE,"-v","error","-select_streams","v:0",
+             "-show_entries","format=duration","-of","csv=p=0",
+             # container duration only: skip stream analysis and read as little as possible
+             "-probesize","32k","-analyzeduration","0", str(path)],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL,
+            timeout=10
         )
         if res.returncode == 0:
-            s = (res.stdout or "").strip()
+            s = res.stdout.strip()
             return float(s) if s else None
     except Exception:
         pass
     return None
 
+def _progress_out_time_us(proc: subprocess.Popen, err_buf: bytearray):
+    """
+    Yield ffmpeg's out_time_ms values (microseconds) from a -progress pipe:1 stream.
+    POSIX: both pipes are non-blocking and multiplexed; each wake-up reads whatever
+    is buffered and yields only the newest value in it, while stderr is drained into
+    err_buf (so a chatty ffmpeg can't block on a full stderr pipe).
+    Windows can't select() on pipes, so it falls back to reading stdout line by line.
+    """
+    if os.name == "nt":
+        # Raw bytes: of the ~12 key=value lines per update only out_time_ms matters,
+        # so the rest are skipped without decoding or stripping them
+        for line in proc.stdout:
+            if line.startswith(b"out_time_ms="):
+                try:
+                    yield int(line[12:])  # int() ignores the trailing newline
+                except ValueError:
+                    pass  # "N/A" before the first packet
+        return
+
+    sel = selectors.DefaultSelector()
+    for pipe in (proc.stdout, proc.stderr):
+        if pipe:
+            os.set_blocking(pipe.fileno(), False)
+            sel.register(pipe, selectors.EVENT_READ)
+
+    partial = b""  # incomplete last line carried to the next read
+    with sel:
+        while sel.get_map():
+            for key, _ in sel.select(0.25):
+                try:
+                    chunk = os.read(key.fd, 65536)
+                except BlockingIOError:
+                    continue
+                if not chunk:
+                    sel.unregister(key.fileobj)
+                    continue
+                if key.fileobj is proc.stderr:
+                    err_buf += chunk
+                    continue
+
+                buf = partial + chunk
+                cut = buf.rfind(b"\n") + 1
+                partial = buf[cut:]
+                i = buf.rfind(b"out_time_ms=", 0, cut)
+                if i >= 0:
+                    try:
+                        yield int(buf[i + 12:buf.index(b"\n", i)])
+                    except ValueError:
+                        pass  # "N/A" before the first packet
+
 def _run_ffmpeg_with_progress(cmd: list[str],
                               effective_total_duration: float,
                               total_clips: int,
@@ -139,8 +335,6 @@ def _run_ffmpeg_with_progress(cmd: list[str],
             cmd_with_prog,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1
         )
     except Exception as ex:
         return (False, f"spawn failed: {ex}")
@@ -149,42 +343,44 @@ def _run_ffmpeg_with_progress(cmd: list[str],
     eff_total = float(effective_total_duration) if (effective_total_duration and effective_total_duration > 0) else 1.0
     total_clips = max(1, int(total_clips))
 
-    last_update_ts = 0.0
+    last_update_ts = -1.0  # monotonic clock; first tick always writes
     last_done = -1  # we’ll only write when done increases
+    last_percent = -1  # ...and the concat percent moved with it
     elapsed_sec = 0.0
 
+    err_buf = bytearray()
+
     try:
         if proc.stdout:
-            for line in proc.stdout:
-                line = (line or "").strip()
-
-                if line.startswith("out_time_ms="):
-                    # ffmpeg reports OUTPUT timestamp here
-                    try:
-                        out_ms = float(line.split("=", 1)[1])
-                        elapsed_sec = out_ms / 1_000_000.0
-                    except Exception:
-                        pass
-
-                    now = time.time()
-                    if now - last_update_ts > 0.25:  # throttle ~4/sec
-                        frac = min(1.0, max(0.0, elapsed_sec / eff_total))
-                        # While running, keep done in [0, total_clips-1]
-                        done = int(math.floor(frac * total_clips))
-                        if done >= total_clips:
-                            done = total_clips - 1
-                        if done > last_done:
-                            _counter_write(job_id, {
-                                "phase": "concat",
-                                "status": "running",
-                                "total": total_clips,
-                                "done": done
-                            }, temp_dir)
-                            last_done = done
-                        last_update_ts = now
+            for out_us in _progress_out_time_us(proc, err_buf):
+                # ffmpeg reports OUTPUT timestamp here
+                elapsed_sec = out_us / 1_000_000.0
+
+                if last_done >= total_clips - 1:
+                    continue  # saturated: only the final snap below can change the counter
+                now = time.monotonic()  # immune to wall-clock steps
+                if now - last_update_ts > 0.25:  # throttle ~4/sec
+                    frac = min(1.0, max(0.0, elapsed_sec / eff_total))
+                    # While running, keep done in [0, total_clips-1]
+                    # (frac >= 0, so int() truncation is the floor)
+                    done = int(frac * total_clips)
+                    if done >= total_clips:
+                        done = total_clips - 1
+                    percent = done * 100 // total_clips
+                    if done > last_done and percent != last_percent:
+                        _counter_write(job_id, {
+                            "phase": "concat",
+                            "status": "running",
+                            "total": total_clips,
+                            "done": done
+                        }, temp_dir, want_concat=want_concat)
+                        last_done = done
+                        last_percent = percent
+                    last_update_ts = now
 
         # finish
         _, err = proc.communicate()
+        err = bytes(err_buf) + (err or b"")
         ok = (proc.returncode == 0)
 
         # Final snap: mark as 100% / total_clips
@@ -195,7 +391,7 @@ def _run_ffmpeg_with_progress(cmd: list[str],
             "done": total_clips
         }, temp_dir, want_concat=want_concat)
 
-        return (ok, (err or "").strip())
+        return (ok, (err or b"").decode("utf-8", "replace").strip())
 
     except Exception as ex:
         try:
@@ -210,9 +406,86 @@ def _run_ffmpeg_with_progress(cmd: list[str],
         }, temp_dir, want_concat=want_concat)
         return (False, f"progress loop failed: {ex}")
 
-def _with_overall_fields(data: dict) -> dict:
+def _remux_concat_av(clip_paths: List[Path], clip_cuts: List[tuple], out_path: Path,
+                     job_id: Optional[str], temp_dir: Optional[Path],
+                     want_concat: bool) -> tuple[bool, str]:
+    """
+    Copy-mode concat in-process with PyAV (no ffmpeg spawn, no -progress pipe).
+    Packets are remuxed into one mp4 with timestamps shifted past the previous
+    clip; (inpoint, outpoint) cuts behave like the concat demuxer's directives
+    (seek to the keyframe before the in point, drop packets from the out point on).
+    Returns (ok, error) like _run_ffmpeg_with_progress.
     """
-    Adds continuous overall progress fields:
+    total_clips = max(1, len(clip_paths))
+    last_percent = -1
+    try:
+        with av.open(str(out_path), "w", format="mp4", options={"movflags": "+faststart"}) as out:
+            out_streams: List[Any] = []
+            layout = None
+            last_dts: Dict[int, int] = {}
+            offset = 0.0  # output seconds where the next clip starts
+            for i, (p, (inpoint, outpoint)) in enumerate(zip(clip_paths, clip_cuts)):
+                with av.open(str(p)) as src:
+                    in_streams = [st for st in src.streams if st.type in ("video", "audio")]
+                    clip_layout = [(st.type, st.codec_context.name) for st in in_streams]
+                    if layout is None:
+                        layout = clip_layout
+                        out_streams = [out.add_stream_from_template(st) for st in in_streams]
+                    elif clip_layout != layout:
+                        return (False, f"stream layout of {p.name} differs from the first clip")
+                    if not in_streams:
+                        continue
+                    out_index = {st.index: k for k, st in enumerate(in_streams)}
+
+                    if inpoint is not None:
+                        src.seek(int(inpoint * av.time_base), backward=True, any_frame=False)
+                        base = inpoint
+                    else:
+                        base = (src.start_time or 0) / av.time_base
+                    shift = offset - base
+                    clip_end = offset
+
+                    for pkt in src.demux(in_streams):
+                        if pkt.dts is None:
+                            continue  # demuxer flush packet
+                        tb = pkt.time_base
+                        if outpoint is not None and pkt.pts is not None and pkt.pts * tb >= outpoint:
+                            continue
+                        idx = out_index[pkt.stream.index]
+                        delta = round(shift / tb)
+                        dts = pkt.dts + delta
+                        prev = last_dts.get(idx)
+                        if prev is not None and dts <= prev:
+                            dts = prev + 1  # keep the muxer's dts strictly increasing across joins
+                        pts = pkt.pts + delta if pkt.pts is not None else dts
+                        pkt.dts = dts
+                        pkt.pts = max(pts, dts)
+                        last_dts[idx] = dts
+                        clip_end = max(clip_end, float((pkt.pts + (pkt.duration or 0)) * tb))
+                        pkt.stream = out_streams[idx]
+                        out.mux(pkt)
+                    offset = clip_end
+
+                done = min(i + 1, total_clips - 1)  # the final snap below reports total
+                percent = done * 100 // total_clips
+                if percent != last_percent:
+                    _counter_write(job_id, {
+                        "phase": "concat", "status": "running",
+                        "total": total_clips, "done": done
+                    }, temp_dir, want_concat=want_concat)
+                    last_percent = percent
+    except Exception as ex:
+        return (False, f"remux failed: {ex}")
+
+    _counter_write(job_id, {
+        "phase": "concat", "status": "done",
+        "total": total_clips, "done": total_clips
+    }, temp_dir, want_concat=want_concat)
+    return (True, "")
+
+def _add_overall_fields(data: dict) -> None:
+    """
+    Adds (in place) continuous overall progress fields:
       - want_concat: bool
       - overall_percent: 0..100 (download=0..50, concat=50..100 if want_concat)
       - overall_status: running/done/error
@@ -222,31 +495,27 @@ def _with_overall_fields(data: dict) -> dict:
     status = str(data.get("status") or "")
     want_concat = bool(data.get("want_concat"))
 
-    # safe numbers
-    try:
-        total = float(data.get("total") or 0)
-    except Exception:
-        total = 0.0
-    try:
-        done = float(data.get("done") or 0)
-    except Exception:
-        done = 0.0
+    # callers always pass ints (or leave them out)
+    total = data.get("total") or 0
+    done = data.get("done") or 0
+
+    data["want_concat"] = want_concat
+    data["overall_percent"], data["overall_status"], data["overall_text"] = _overall_fields(
+        phase, status, want_concat, total, done, str(data.get("mode") or ""))
 
+# (offset, span) of the overall bar per phase when the job downloads *and* concatenates
+_PHASE_WEIGHTS = {"download": (0.0, 0.5), "concat": (0.5, 0.5)}
+
+@functools.lru_cache(maxsize=256)
+def _overall_fields(phase: str, status: str, want_concat: bool,
+                    total: int, done: int, mode: str) -> tuple[int, str, str]:
+    """(overall_percent, overall_status, overall_text); memoized, as most ticks repeat the last snapshot."""
     frac = (done / total) if total > 0 else 0.0
     frac = max(0.0, min(1.0, frac))
 
-    # continuous overall percent
-    if not want_concat:
-        overall = frac
-    else:
-        if phase == "download":
-            overall = 0.50 * frac
-        elif phase == "concat":
-            overall = 0.50 + 0.50 * frac
-        else:
-            overall = 0.0
-
-    overall_percent = int(round(100.0 * max(0.0, min(1.0, overall))))
+    # continuous overall percent: each phase owns a slice [offset, offset + span]
+    offset, span = _PHASE_WEIGHTS.get(phase, (0.0, 0.0)) if want_concat else (0.0, 1.0)
+    overall_percent = int(round(100.0 * (offset + span * frac)))
 
     # overall status + text
     if want_concat and phase == "download" and status == "done":
@@ -264,19 +533,12 @@ def _with_overall_fields(data: dict) -> dict:
         if phase == "download":
             overall_text = f"overall {overall_percent}% — downloading {int(done)}/{int(total)}"
         elif phase == "concat":
-            mode = data.get("mode") or ""
             mode_txt = f" ({mode})" if mode else ""
             overall_text = f"overall {overall_percent}% — concatenating{mode_txt} {int(done)}/{int(total)}"
         else:
             overall_text = f"overall {overall_percent}% — {phase} {status}".strip()
 
-    return {
-        **data,
-        "want_concat": want_concat,
-        "overall_percent": overall_percent,
-        "overall_status": overall_status,
-        "overall_text": overall_text,
-    }
+    return overall_percent, overall_status, overall_text
 
 
 # =============================================================================
@@ -285,11 +547,22 @@ def _with_overall_fields(data: dict) -> dict:
 
 @router.get("/events/download_counter")
 def events_download_counter(job_id: str):
-    p = _counter_path(job_id)  # temp_dir optional; default is ./temp
-    if not p.exists():
+    p_s, _ = _counter_paths(job_id)  # temp_dir optional; default is ./temp
+    try:
+        mtime = os.stat(p_s).st_mtime_ns
+    except FileNotFoundError:
+        _COUNTER_CACHE.pop(p_s, None)
         return {"job_id": job_id, "available": False}
     try:
-        data = json.loads(p.read_text(encoding="utf-8"))
+        hit = _COUNTER_CACHE.get(p_s)
+        if hit and hit[0] == mtime:
+            data = hit[1]
+        else:
+            # Cold cache (e.g. after a restart) or written by someone else: read it once
+            with open(p_s, "rb") as f:
+                data = _json_loads(f.read())
+            _COUNTER_CACHE[p_s] = (mtime, data)
+        data = dict(data)  # the cached snapshot stays untouched
         data["job_id"] = job_id
         data["available"] = True
         return data
@@ -302,6 +575,13 @@ def events_download_counter(job_id: str):
 # PUBLIC: Camera/event summaries
 # =============================================================================
 
+_UNFINISHED_END = frozenset({"null", "none", "0000-00-00 00:00:00"})
+
+def _is_finished(e: Dict[str, Any]) -> bool:
+    """True if a ZM Event has a real EndTime (i.e. it is no longer recording)."""
+    end = str(e.get("EndTime", "")).strip().lower()
+    return bool(end) and end not in _UNFINISHED_END
+
 @router.get("/events/summary")
 def events_summary(
     ids: Optional[str] = Query(None, description="Comma-separated monitor IDs, e.g. 1,2,5"),
@@ -332,25 +612,23 @@ def events_summary(
         except Exception: return None
 
     def _pick_event(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        evs = data.get("events") or []
-        for w in evs:
-            e = w.get("Event", {})
-            end = str(e.get("EndTime", "")).strip().lower()
-            if end and end not in ("null", "none", "0000-00-00 00:00:00"):
-                return {"Id": int(e.get("Id", 0)), "StartTime": e.get("StartTime"), "EndTime": e.get("EndTime")}
-        if evs:
-            e = evs[0].get("Event", {})
-            return {"Id": int(e.get("Id", 0)), "StartTime": e.get("StartTime"), "EndTime": e.get("EndTime")}
-        return None
+        # First finished event, else the first one (still recording)
+        evs = [w.get("Event", {}) for w in (data.get("events") or [])]
+        e = next((e for e in evs if _is_finished(e)), evs[0] if evs else None)
+        if e is None:
+            return None
+        return {"Id": int(e.get("Id", 0)), "StartTime": e.get("StartTime"), "EndTime": e.get("EndTime")}
 
     def _fetch_json(url: str) -> Optional[Dict[str, Any]]:
         try:
-            r = requests.get(url, auth=auth, verify=False, timeout=15)
-            logs.append(f"{r.status_code} {url}")
+            r = _ZM_SESSION.get(url, auth=auth, timeout=15)
+            if debug:  # don't format log lines nobody will see
+                logs.append(f"{r.status_code} {url}")
             if r.ok:
-                return r.json()
+                return _response_json(r)
         except Exception as e:
-            logs.append(f"ERR {url} -> {e}")
+            if debug:
+                logs.append(f"ERR {url} -> {e}")
         return None
 
     def _parse_monitor_wrap(wrap: Dict[str, Any]) -> Dict[str, Any]:
@@ -368,15 +646,16 @@ def events_summary(
             "CaptureFPS": capture_fps,
         }
 
+    pool = ThreadPoolExecutor(max_workers=_ZM_FETCH_WORKERS)
+
     # Build monitor list (either selection or all)
     mon_info: Dict[int, Dict[str, Any]] = {}
     if ids:
         mids = [int(tok.strip()) for tok in ids.split(",") if tok.strip().isdigit()]
+        murls = [f"{base}/zm/api/monitors/{mid}.json" + (f"?token={token}" if token else "") for mid in mids]
         monitors = []
-        for mid in mids:
-            murl = f"{base}/zm/api/monitors/{mid}.json"
-            if token: murl += f"?token={token}"
-            md = _fetch_json(murl) or {}
+        for mid, md in zip(mids, pool.map(_fetch_json, murls)):
+            md = md or {}
             if md.get("monitor"):
                 info = _parse_monitor_wrap(md)
             else:
@@ -394,7 +673,8 @@ def events_summary(
             mon_info[info["Id"]] = info
             monitors.append({"Id": info["Id"], "Name": info.get("Name")})
 
-    # For each monitor, get earliest & latest finished events
+    # For each monitor, get earliest & latest finished events (all lookups in flight at once)
+    urls = []
     for m in monitors:
         mid = m["Id"]
         asc  = f"{base}/zm/api/events/index/MonitorId:{mid}.json?sort=StartTime&direction=asc&limit=2"
@@ -402,9 +682,14 @@ def events_summary(
         if token:
             asc  += f"&token={token}"
             desc += f"&token={token}"
+        urls += [asc, desc]
 
-        earliest = _pick_event(_fetch_json(asc) or {})
-        latest   = _pick_event(_fetch_json(desc) or {})
+    with pool:
+        picked = list(pool.map(lambda url: _pick_event(_fetch_json(url) or {}), urls))
+
+    for i, m in enumerate(monitors):
+        mid = m["Id"]
+        earliest, latest = picked[2 * i], picked[2 * i + 1]
 
         info = mon_info.get(mid, {})
         results.append({
@@ -442,7 +727,6 @@ def events_videos(
     with simple video + JSON links. Internally loops pages until exhausted.
     """
     import zm_ai
-    from urllib.parse import quote
 
     zm_ai.load_config()
 
@@ -463,46 +747,47 @@ def events_videos(
     e_enc = quote(e, safe="")
 
     events_out = []
-    page = 1
-
-    while True:
-        url = (
-            f"{base}/zm/api/events/index"
-            f"/MonitorId:{monitor_id}"
-            f"/StartTime >=:{s_enc}"
-            f"/StartTime <=:{e_enc}.json"
-            f"?sort=StartTime&direction=asc&limit={int(chunk)}&page={int(page)}"
-        )
-        if token:
-            url += f"&token={token}"
+
+    # Everything but the page number is the same for every request
+    url_prefix = (
+        f"{base}/zm/api/events/index"
+        f"/MonitorId:{monitor_id}"
+        f"/StartTime >=:{s_enc}"
+        f"/StartTime <=:{e_enc}.json"
+        f"?sort=StartTime&direction=asc&limit={int(chunk)}&page="
+    )
+    token_suffix = f"&token={token}" if token else ""
+
+    def _fetch_page(page: int) -> Optional[Dict[str, Any]]:
+        url = f"{url_prefix}{int(page)}{token_suffix}"
 
         try:
-            r = requests.get(url, auth=auth, verify=False, timeout=30)
-            logs.append(f"{r.status_code} {url}")
+            r = _ZM_SESSION.get(url, auth=auth, timeout=30)
+            if debug:  # don't format log lines nobody will see
+                logs.append(f"{r.status_code} {url}")
             if not r.ok:
-                break
-            data = r.json() or {}
+                return None
+            return _response_json(r) or {}
         except Exception as exc:
-            logs.append(f"ERR fetching page {page}: {exc}")
-            break
+            if debug:
+                logs.append(f"ERR fetching page {page}: {exc}")
+            return None
 
-        wraps = data.get("events") or []
-        if not wraps:
-            break
+    # Per-event links only differ by eid
+    video_prefix = f"{base}/zm/index.php?view=video&eid="
+    video_suffix = f"&token={token}" if token else ""
+    json_prefix  = f"{base}/zm/api/events/"
+    json_suffix  = f".json?token={token}" if token else ".json"
 
+    def _add_events(wraps: List[Dict[str, Any]]) -> None:
+        append = events_out.append
         for wrap in wraps:
             ev = (wrap or {}).get("Event") or {}
             eid = int(ev.get("Id") or 0)
             if not eid:
                 continue
 
-            video_url = f"{base}/zm/index.php?view=video&eid={eid}"
-            json_url  = f"{base}/zm/api/events/{eid}.json"
-            if token:
-                video_url += f"&token={token}"
-                json_url  += f"?token={token}"
-
-            events_out.append({
+            append({
                 "EventId": eid,
                 "MonitorId": int(ev.get("MonitorId") or monitor_id),
                 "StartTime": ev.get("StartTime"),
@@ -510,18 +795,37 @@ def events_videos(
                 "Length": ev.get("Length"),
                 "Frames": ev.get("Frames"),
                 "Score": ev.get("MaxScore"),
-                "VideoURL": video_url,
-                "EventJSON": json_url,
+                "VideoURL": f"{video_prefix}{eid}{video_suffix}",
+                "EventJSON": f"{json_prefix}{eid}{json_suffix}",
             })
 
+    def _page_count(data: Dict[str, Any]) -> int:
         p = (data.get("pagination") or data.get("Pagination") or {})
-        page_count = int(p.get("pageCount") or 0)
-        if page_count and page >= page_count:
-            break
-        if len(wraps) < int(chunk):
-            break
-
-        page += 1
+        return int(p.get("pageCount") or 0)
+
+    data = _fetch_page(1)
+    wraps = (data or {}).get("events") or []
+    _add_events(wraps)
+    page_count = _page_count(data) if wraps else 0
+
+    if page_count > 1:
+        # Page count is known up front: fetch the rest concurrently, keep them in order
+        with ThreadPoolExecutor(max_workers=min(_ZM_FETCH_WORKERS, page_count - 1)) as pool:
+            for data in pool.map(_fetch_page, range(2, page_count + 1)):
+                wraps = (data or {}).get("events") or []
+                if not wraps:
+                    break
+                _add_events(wraps)
+    elif wraps and not page_count:
+        # No pagination info: walk pages until a short or empty one
+        page = 1
+        while len(wraps) >= int(chunk):
+            page += 1
+            data = _fetch_page(page)
+            wraps = (data or {}).get("events") or []
+            if not wraps:
+                break
+            _add_events(wraps)
 
     payload = {"events": events_out, "count": len(events_out)}
     if debug:
@@ -533,11 +837,48 @@ def events_videos(
 # Internals for /events/videos/export
 # =============================================================================
 
+@functools.lru_cache(maxsize=4096)
+def _parse_dt(s: str) -> datetime:
+    """Parse 'YYYY-mm-dd HH:MM[:SS]' (space or 'T'); memoized for repeated boundary strings."""
+    s = (s or "").strip().replace("T", " ")
+    try:
+        return datetime.fromisoformat(s)  # C parser; covers ZoneMinder's zero-padded timestamps
+    except ValueError:
+        pass
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M"):
+        try:
+            return datetime.strptime(s, fmt)
+        except ValueError:
+            pass
+    raise ValueError(f"unrecognized timestamp: {s!r}")
+
+def _write_events_json(path: Path, events: List[dict], count: int) -> int:
+    """
+    Write {"events": [...], "count": N} one event per line, encoding each event
+    on its own so peak memory is a single event rather than the whole document.
+    Returns the number of bytes written.
+    """
+    written = 0
+    with open(path, "wb", buffering=1 << 20) as fh:
+        written += fh.write(b'{"events": [')
+        for i, e in enumerate(events):
+            written += fh.write(b",\n  " if i else b"\n  ")
+            written += fh.write(_json_dumps(e))
+        written += fh.write(b'\n], "count": %d}\n' % int(count))
+    return written
+
+class _DroppedLogs(list):
+    """Stand-in for the export's logs list when debug is off: appends are discarded."""
+    def append(self, item) -> None:
+        pass
+
 def _fmt_secs(x: float) -> str:
     """ffmpeg accepts fractional seconds; format robustly."""
+    if isinstance(x, (int, float)):
+        return f"{x:.3f}"  # the common case: no float() round-trip, no try block
     try:
         return f"{float(x):.3f}"
-    except Exception:
+    except (TypeError, ValueError):
         return "0.000"
 
 def _run_ffmpeg(cmd: list[str]) -> tuple[bool, str]:
@@ -547,6 +888,60 @@ def _run_ffmpeg(cmd: list[str]) -> tuple[bool, str]:
         return True, ""
     return False, (res.stderr.decode(errors="ignore")[:400] if res.stderr else "")
 
+_DOWNLOAD_CHUNK = 128 * 1024       # iter_content read size for clip downloads
+_DOWNLOAD_EMIT_BYTES = 8 << 20     # ...and the most bytes between two counter updates
+_DOWNLOAD_WORKERS = 4              # clips fetched from ZoneMinder at once
+_DOWNLOAD_WRITE_BUFFER = 1 << 20   # file buffer per clip: ~8 chunks per write syscall
+_PROBE_WORKERS = 16                # clip durations probed at once before concat
+
+@functools.lru_cache(maxsize=1)
+def _ffmpeg_gpu_encoders() -> frozenset:
+    """GPU H.264 encoders this ffmpeg build offers (asked once per process)."""
+    try:
+        res = subprocess.run(
+            [_FFMPEG, "-hide_banner", "-v", "error", "-encoders"],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+        )
+        enc_list = res.stdout or ""
+    except Exception:
+        enc_list = ""
+    return frozenset(e for e in ("h264_nvenc", "h264_vaapi") if e in enc_list)
+
+def _detect_gpu_encoder() -> tuple[str, Optional[str]]:
+    encoders = _ffmpeg_gpu_encoders()
+    if "h264_nvenc" in encoders:
+        return ("h264_nvenc", None)
+    if "h264_vaapi" in encoders:
+        # render nodes can come and go (driver reload); look them up per call
+        devs = sorted(glob.glob("/dev/dri/renderD*"))
+        if devs:
+            return ("h264_vaapi", devs[0])
+    return ("libx264", None)
+
+def _trim_clips(TEMP_DIR: Path, monitor_id: int, cuts: Dict[int, tuple], logs: List[str]) -> None:
+    """Stream-copy trim each clip in place to its (inpoint, outpoint) cut."""
+    for eid, (inpoint, outpoint) in cuts.items():
+        fp = TEMP_DIR / f"{monitor_id}-{eid}.mp4"
+        if not fp.exists():
+            continue
+        outp = fp.with_suffix(".part")
+        cmd = [_FFMPEG, "-hide_banner", "-loglevel", "error", "-y"]
+        if inpoint is not None:
+            cmd += ["-ss", _fmt_secs(inpoint)]
+        cmd += ["-i", str(fp)]
+        if outpoint is not None:
+            cmd += ["-t", _fmt_secs(outpoint - (inpoint or 0.0))]
+        cmd += [
+            "-c", "copy", "-map", "0",
+            "-fflags", "+genpts", "-movflags", "+faststart",
+            "-f", "mp4", str(outp),
+        ]
+        ok, err = _run_ffmpeg(cmd)
+        if ok: outp.replace(fp)
+        else:
+            label = "TRIM_BOTH" if inpoint is not None and outpoint is not None else ("TRIM_FIRST" if inpoint is not None else "TRIM_LAST")
+            logs.append(f"{label} ERR: {err}")
+
 def _download_and_trim( *, TEMP_DIR: Path, monitor_id: int, events_out: list[dict], auth, download: bool, trim: bool, logs: list[str], job_id: Optional[str], want_concat: bool ) -> dict:
     """ 
     SECTION A: Download all clips (if download=True). Then trim first/last
@@ -554,12 +949,11 @@ def _download_and_trim( *, TEMP_DIR: Path, monitor_id: int, events_out: list[dic
 
     Returns stats dict:
       attempted, downloaded, skipped_existing, failed, bytes, downloaded_now (list of EIDs in order)
+      and, when want_concat, cuts ({eid: (inpoint, outpoint)}) for _concat_downloads to apply
     """
-    import requests
-
     stats = {
         "attempted": 0, "downloaded": 0, "skipped_existing": 0,
-        "failed": 0, "bytes": 0, "downloaded_now": []
+        "failed": 0, "bytes": 0, "downloaded_now": [], "cuts": {}
     }
 
     if not download or not events_out:
@@ -571,72 +965,87 @@ def _download_and_trim( *, TEMP_DIR: Path, monitor_id: int, events_out: list[dic
         "total": total_to_download, "done": 0, "bytes": 0, "current_file": None
     }, TEMP_DIR, want_concat=want_concat)
 
-    for e in events_out:
-        eid = e["EventId"]
-        fmp4 = TEMP_DIR / f"{monitor_id}-{eid}.mp4"
-        ftmp = fmp4.with_suffix(".part")
+    # Clips download in parallel; stats and counter writes (one shared tmp file) are
+    # serialised by `lock`
+    lock = threading.Lock()
+    emit_state = {"ts": time.monotonic(), "bytes": 0}
 
+    def _emit(status: str, current_file: Optional[str], **extra) -> None:
+        # caller holds `lock`
         _counter_write(job_id, {
-            "phase": "download", "status": "downloading", "monitor_id": monitor_id,
+            "phase": "download", "status": status, "monitor_id": monitor_id,
             "total": total_to_download, "done": stats["downloaded"],
-            "bytes": stats["bytes"], "current_file": fmp4.name
+            "bytes": stats["bytes"], "current_file": current_file, **extra
         }, TEMP_DIR, want_concat=want_concat)
 
-        try:
-            with requests.get(e["VideoURL"], auth=auth, verify=False, stream=True, timeout=180) as resp:
-                stats["attempted"] += 1
-                if resp.status_code != 200:
-                    stats["failed"] += 1
-                    _counter_write(job_id, {
-                        "phase": "download", "status": "error", "monitor_id": monitor_id,
-                        "total": total_to_download, "done": stats["downloaded"],
-                        "bytes": stats["bytes"], "current_file": fmp4.name, "http": resp.status_code
-                    }, TEMP_DIR, want_concat=want_concat)
-                    continue
+    def _emit_throttled(status: str, current_file: Optional[str]) -> None:
+        # caller holds `lock`; progress-only updates: at most ~4/sec, or every 8 MiB on a fast link
+        now = time.monotonic()
+        if now - emit_state["ts"] > 0.25 or stats["bytes"] - emit_state["bytes"] > _DOWNLOAD_EMIT_BYTES:
+            _emit(status, current_file)
+            emit_state["ts"] = now
+            emit_state["bytes"] = stats["bytes"]
 
-                with open(ftmp, "wb") as fh:
-                    for chunk in resp.iter_content(chunk_size=1024 * 1024):
+    def _fetch_one(e: dict) -> Optional[int]:
+        """Download one event clip; returns its EventId on success."""
+        eid = e["EventId"]
+        fmp4 = TEMP_DIR / f"{monitor_id}-{eid}.mp4"
+
+        with lock:
+            _emit_throttled("downloading", fmp4.name)
+
+        try:
+            with _ZM_SESSION.get(e["VideoURL"], auth=auth, stream=True, timeout=180) as resp:
+                with lock:
+                    stats["attempted"] += 1
+                    if resp.status_code != 200:
+                        stats["failed"] += 1
+                        _emit("error", fmp4.name, http=resp.status_code)
+                        return None
+
+                # Straight to the final name: a bad status never gets here, and a
+                # broken stream is unlinked below, so no .part + rename is needed
+                fd = os.open(fmp4, _COUNTER_OPEN_FLAGS, 0o644)
+                with os.fdopen(fd, "wb", buffering=_DOWNLOAD_WRITE_BUFFER) as fh:
+                    for chunk in resp.iter_content(chunk_size=_DOWNLOAD_CHUNK):
                         if not chunk:
                             continue
                         fh.write(chunk)
-                        stats["bytes"] += len(chunk)
-                        _counter_write(job_id, {
-                            "phase": "download", "status": "downloading", "monitor_id": monitor_id,
-                            "total": total_to_download, "done": stats["downloaded"],
-                            "bytes": stats["bytes"], "current_file": fmp4.name
-                        }, TEMP_DIR, want_concat=want_concat)
 
-            ftmp.replace(fmp4)
-            stats["downloaded_now"].append(eid)
-            stats["downloaded"] += 1
+                        with lock:
+                            stats["bytes"] += len(chunk)
+                            _emit_throttled("downloading", fmp4.name)
 
-            _counter_write(job_id, {
-                "phase": "download", "status": "file_done", "monitor_id": monitor_id,
-                "total": total_to_download, "done": stats["downloaded"],
-                "bytes": stats["bytes"], "current_file": fmp4.name
-            }, TEMP_DIR, want_concat=want_concat)
+            with lock:
+                stats["downloaded"] += 1
+                _emit_throttled("file_done", fmp4.name)
+            return eid
 
         except Exception as ex:
             logs.append(f"ERR download eid={eid}: {ex}")
-            stats["failed"] += 1
-            try: ftmp.unlink()
+            try: fmp4.unlink()
             except Exception: pass
-            _counter_write(job_id, {
-                "phase": "download", "status": "error", "monitor_id": monitor_id,
-                "total": total_to_download, "done": stats["downloaded"],
-                "bytes": stats["bytes"], "current_file": fmp4.name, "error": str(ex)
-            }, TEMP_DIR, want_concat=want_concat)
+            with lock:
+                stats["failed"] += 1
+                _emit("error", fmp4.name, error=str(ex))
+            return None
+
+    with ThreadPoolExecutor(max_workers=min(_DOWNLOAD_WORKERS, total_to_download)) as pool:
+        fetched = list(pool.map(_fetch_one, events_out))
+    # event order (not completion order): trimming below relies on first/last
+    stats["downloaded_now"] = [eid for eid in fetched if eid is not None]
 
     # --- Optional first/last trim (only the files downloaded this run) ---
     if trim and stats["downloaded_now"]:
-        has_ffmpeg = shutil.which("ffmpeg") is not None
+        has_ffmpeg = _FFMPEG is not None
         if not has_ffmpeg:
             logs.append("ERR: ffmpeg not found on PATH; trimming disabled")
         else:
             first_id = stats["downloaded_now"][0]
             last_id  = stats["downloaded_now"][-1]
-            first_e  = next(e for e in events_out if e["EventId"] == first_id)
-            last_e   = next(e for e in reversed(events_out) if e["EventId"] == last_id)
+            by_eid   = {e["EventId"]: e for e in events_out}
+            first_e  = by_eid[first_id]
+            last_e   = by_eid[last_id]
 
             first_fp = TEMP_DIR / f"{monitor_id}-{first_id}.mp4"
             last_fp  = TEMP_DIR / f"{monitor_id}-{last_id}.mp4"
@@ -654,45 +1063,22 @@ def _download_and_trim( *, TEMP_DIR: Path, monitor_id: int, events_out: list[dic
             logs.append(f"INTENT first_eid={first_id} off={first_off:.3f}s dur={first_dur:.3f}s len={first_len:.3f}s")
             logs.append(f"INTENT last_eid={last_id}  keep_dur={last_dur:.3f}s len={last_len:.3f}s")
 
-            if first_id == last_id and first_fp.exists():
-                outp = first_fp.with_suffix(".part")
-                ok, err = _run_ffmpeg([
-                    "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
-                    "-ss", _fmt_secs(first_off), "-i", str(first_fp),
-                    "-t",  _fmt_secs(first_dur),
-                    "-c", "copy", "-map", "0",
-                    "-fflags", "+genpts", "-movflags", "+faststart",
-                    "-f", "mp4", str(outp),
-                ])
-                if ok: outp.replace(first_fp)
-                else:  logs.append(f"TRIM_BOTH ERR: {err}")
+            # eid -> (in point, out point) in seconds within that clip; None = untouched end
+            cuts: Dict[int, tuple] = {}
+            if first_id == last_id:
+                if first_fp.exists():
+                    cuts[first_id] = (first_off, first_off + first_dur)
             else:
                 if first_fp.exists() and first_off > 0.01:
-                    outp = first_fp.with_suffix(".part")
-                    ok, err = _run_ffmpeg([
-                        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
-                        "-ss", _fmt_secs(first_off), "-i", str(first_fp),
-                        "-c", "copy", "-map", "0",
-                        "-fflags", "+genpts", "-movflags", "+faststart",
-                        "-f", "mp4", str(outp),
-                    ])
-                    if ok: outp.replace(first_fp)
-                    else:  logs.append(f"TRIM_FIRST ERR: {err}")
-
-                if last_fp.exists():
-                    needs_tail_cut = (last_len - last_dur) > 0.25 and last_dur > 0.01
-                    if needs_tail_cut:
-                        outp = last_fp.with_suffix(".part")
-                        ok, err = _run_ffmpeg([
-                            "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
-                            "-i", str(last_fp),
-                            "-t", _fmt_secs(last_dur),
-                            "-c", "copy", "-map", "0",
-                            "-fflags", "+genpts", "-movflags", "+faststart",
-                            "-f", "mp4", str(outp),
-                        ])
-                        if ok: outp.replace(last_fp)
-                        else:  logs.append(f"TRIM_LAST ERR: {err}")
+                    cuts[first_id] = (first_off, None)
+                if last_fp.exists() and (last_len - last_dur) > 0.25 and last_dur > 0.01:
+                    cuts[last_id] = (None, last_dur)
+
+            if want_concat:
+                # applied as inpoint/outpoint in the concat list: one ffmpeg pass instead of three
+                stats["cuts"] = cuts
+            else:
+                _trim_clips(TEMP_DIR, monitor_id, cuts, logs)
 
     # mark the counter as done for the download phase
     _counter_write(job_id, {
@@ -705,14 +1091,15 @@ def _download_and_trim( *, TEMP_DIR: Path, monitor_id: int, events_out: list[dic
 def _concat_downloads(
     *, TEMP_DIR: Path, monitor_id: int, s_in: str, e_in: str,
     downloaded_now: List[int], speed: float, fps: Optional[int], size: Optional[str],
-    use_gpu: bool, logs: List[str], job_id: Optional[str], want_concat: bool
+    use_gpu: bool, logs: List[str], job_id: Optional[str], want_concat: bool,
+    cuts: Optional[Dict[int, tuple]] = None
 ) -> dict:
     """
     SECTION B: Concatenate the downloaded clips (copy or re-encode).
     Emits intermediate counter updates using ffmpeg -progress pipe:1.
+    First/last trims from _download_and_trim (cuts) go into the list file as
+    inpoint/outpoint directives so the concat demuxer applies them in the same pass.
     """
-    import glob
-
     concat_info = {
         "enabled": False, "path": None, "bytes": 0,
         "mode": None, "list": None, "encoder": None, "device": None,
@@ -731,29 +1118,12 @@ def _concat_downloads(
                 return None
         return None
 
-    def _detect_gpu_encoder() -> tuple[str, Optional[str]]:
-        try:
-            res = subprocess.run(
-                ["ffmpeg", "-hide_banner", "-v", "error", "-encoders"],
-                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
-            )
-            enc_list = res.stdout or ""
-        except Exception:
-            enc_list = ""
-        if "h264_nvenc" in enc_list:
-            return ("h264_nvenc", None)
-        if "h264_vaapi" in enc_list:
-            devs = sorted(glob.glob("/dev/dri/renderD*"))
-            if devs:
-                return ("h264_vaapi", devs[0])
-        return ("libx264", None)
-
     def _ffprobe_has_audio(path: Path) -> bool:
-        if shutil.which("ffprobe") is None or not path.exists():
+        if _FFPROBE is None or not path.exists():
             return False
         try:
             res = subprocess.run(
-                ["ffprobe", "-v", "error", "-select_streams", "a:0",
+                [_FFPROBE, "-v", "error", "-select_streams", "a:0",
                  "-show_entries", "stream=codec_type", "-of", "csv=p=0", str(path)],
                 stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
             )
@@ -771,7 +1141,7 @@ def _concat_downloads(
         }, TEMP_DIR)
         return concat_info
 
-    if shutil.which("ffmpeg") is None:
+    if _FFMPEG is None:
         logs.append("ERR: ffmpeg not found on PATH; concat disabled")
         _counter_write(job_id, {
             "phase": "concat", "status": "error",
@@ -781,11 +1151,14 @@ def _concat_downloads(
         return concat_info
 
     # Build concat list in order of download
+    cuts = cuts or {}
     clip_paths: List[Path] = []
+    clip_cuts: List[tuple] = []
     for eid in downloaded_now:
         p = TEMP_DIR / f"{monitor_id}-{eid}.mp4"
         if p.exists():
             clip_paths.append(p)
+            clip_cuts.append(cuts.get(eid, (None, None)))
     if not clip_paths:
         logs.append("CONCAT: no local clips exist; skipping")
         _counter_write(job_id, {
@@ -797,13 +1170,23 @@ def _concat_downloads(
     # Prepare list file
     list_name = f"concat_m{monitor_id}_{_safe_id(s_in)}_to_{_safe_id(e_in)}.txt"
     list_path = TEMP_DIR / list_name
-    with list_path.open("w", encoding="utf-8") as lf:
-        for p in clip_paths:
-            lf.write(f"file '{p.as_posix()}'\n")
+    lines: List[str] = []
+    for p, (inpoint, outpoint) in zip(clip_paths, clip_cuts):
+        lines.append(f"file '{p.as_posix()}'\n")
+        if inpoint is not None:
+            lines.append(f"inpoint {_fmt_secs(inpoint)}\n")
+        if outpoint is not None:
+            lines.append(f"outpoint {_fmt_secs(outpoint)}\n")
+    # Rebuilt for every job, so one unbuffered write and no fsync (same as the counter files)
+    fd = os.open(list_path, _COUNTER_OPEN_FLAGS, 0o644)
+    try:
+        os.write(fd, "".join(lines).encode("utf-8"))
+    finally:
+        os.close(fd)
     out_path = TEMP_DIR / f"concat_m{monitor_id}_{_safe_id(s_in)}_to_{_safe_id(e_in)}.mp4"
     concat_info["list"] = str(list_path)
-    concat_info["list_url"] = f"/zm_ai/temp/{list_path.name}"
-    concat_info["path_url"] = f"/zm_ai/temp/{out_path.name}"
+    concat_info["list_url"] = _TEMP_URL_PREFIX + list_path.name
+    concat_info["path_url"] = _TEMP_URL_PREFIX + out_path.name
 
     # Mode decision
     want_speed = (abs(float(speed) - 1.0) > 1e-6)
@@ -816,10 +1199,13 @@ def _concat_downloads(
 
     # Compute total concatenated duration (sum of inputs)
     total_seconds = 0.0
-    for p in clip_paths:
-        d = _ffprobe_duration_seconds(p)
+    with ThreadPoolExecutor(max_workers=min(_PROBE_WORKERS, len(clip_paths))) as pool:
+        durations = list(pool.map(_ffprobe_duration_seconds, clip_paths))
+    for d, (inpoint, outpoint) in zip(durations, clip_cuts):
         if d:
-            total_seconds += d
+            if outpoint is not None:
+                d = min(d, outpoint)
+            total_seconds += max(0.0, d - (inpoint or 0.0))
 
     # effective output duration accounts for speed (setpts)
     effective_total_seconds = total_seconds
@@ -845,7 +1231,7 @@ def _concat_downloads(
     if not want_speed and not want_fps and not want_size:
         # COPY mode
         cmd = [
-            "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+            _FFMPEG, "-hide_banner", "-loglevel", "error", "-y",
             "-f", "concat", "-safe", "0", "-i", str(list_path),
             "-c", "copy", "-movflags", "+faststart",
             str(out_path),
@@ -879,7 +1265,7 @@ def _concat_downloads(
                 chain.append(s)
             af_chain = ",".join([f"atempo={x:.6f}" for x in chain])
 
-        cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+        cmd = [_FFMPEG, "-hide_banner", "-loglevel", "error", "-y",
                "-f", "concat", "-safe", "0", "-i", str(list_path)]
 
         if encoder == "h264_nvenc":
@@ -912,14 +1298,25 @@ def _concat_downloads(
 
         cmd += ["-movflags", "+faststart", str(out_path)]
 
-    # Run ffmpeg with progress mapping → intermediate counter updates
-    ok, err = _run_ffmpeg_with_progress(
-        cmd,
-        effective_total_duration=effective_total_seconds,
-        total_clips=len(clip_paths),
-        job_id=job_id,
-        temp_dir=TEMP_DIR,
-        logs=logs, want_concat=want_concat)
+    ok = False
+    if concat_info["mode"] == "copy" and av is not None:
+        # Packet copy in-process; the ffmpeg command above stays as the fallback
+        ok, err = _remux_concat_av(clip_paths, clip_cuts, out_path,
+                                   job_id=job_id, temp_dir=TEMP_DIR, want_concat=want_concat)
+        if ok:
+            logs.append(f"REMUX (PyAV) {len(clip_paths)} clips -> {out_path.name}")
+        else:
+            logs.append(f"REMUX ERR: {err[:400]}; falling back to ffmpeg")
+
+    if not ok:
+        # Run ffmpeg with progress mapping → intermediate counter updates
+        ok, err = _run_ffmpeg_with_progress(
+            cmd,
+            effective_total_duration=effective_total_seconds,
+            total_clips=len(clip_paths),
+            job_id=job_id,
+            temp_dir=TEMP_DIR,
+            logs=logs, want_concat=want_concat)
 
     if not ok:
         logs.append(f"CONCAT ERR({concat_info['mode']}): {err[:400]}")
@@ -966,7 +1363,7 @@ def events_videos_export(
     monitor_id: int = Query(..., description="Monitor ID (e.g., 1)"),
     start: str = Query(..., description="Inclusive start time: 'YYYY-MM-DD HH:MM:SS' or ISO"),
     end: str = Query(..., description="Inclusive end time: 'YYYY-MM-DD HH:MM:SS' or ISO"),
-    chunk: int = Query(200, description="Internal fetch size per page"),
+    chunk: int = Query(1000, description="Internal fetch size per page"),
     download: bool = Query(False, description="Also download MP4s to ./temp/"),
     debug: bool = Query(False, description="Include request log"),
     debug_level: int = Query(1, ge=0, le=2, description="0=off, 1=summary, 2=verbose"),
@@ -986,17 +1383,6 @@ def events_videos_export(
     """
     try:
         import zm_ai
-        from urllib.parse import quote
-        from datetime import datetime, timedelta
-
-        def _parse_dt(s: str) -> datetime:
-            s = (s or "").strip().replace("T", " ")
-            for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M"):
-                try:
-                    return datetime.strptime(s, fmt)
-                except Exception:
-                    pass
-            return datetime.fromisoformat(s.replace(" ", "T"))
 
         def _hms(total_seconds: float) -> str:
             total_seconds = int(max(0, total_seconds))
@@ -1007,7 +1393,8 @@ def events_videos_export(
 
         # --- config/auth ---
         zm_ai.load_config()
-        logs: List[str] = []
+        # only returned when debug=True; otherwise don't keep the lines around
+        logs: List[str] = [] if debug else _DroppedLogs()
         base = (zm_ai.ZM_HOST or "").rstrip("/")
         user, pwd = zm_ai.BAUTH_USER, zm_ai.BAUTH_PWD
         token = zm_ai.get_saved_token()
@@ -1033,11 +1420,12 @@ def events_videos_export(
         BUF = timedelta(seconds=int(max(0, buffer)))
         dt_start_adj = dt_start - BUF
         dt_end_adj   = dt_end + BUF
+        # Server-side lower bound: events that ended before the buffered window
+        # can never overlap it, so don't page through the monitor's whole history
+        floor_enc = quote(dt_start_adj.strftime("%Y-%m-%d %H:%M:%S"), safe="")
 
         # paths
-        PROJECT_ROOT = Path(__file__).resolve().parent
-        TEMP_DIR = PROJECT_ROOT / "temp"
-        TEMP_DIR.mkdir(parents=True, exist_ok=True)
+        TEMP_DIR = _default_temp_dir()
 
         want_concat = bool(download and concat)
 
@@ -1048,10 +1436,18 @@ def events_videos_export(
 
         pages_hit = 0
 
+        # per-event constants, hoisted out of the page loop
+        min_overlap_secs = float(BUF.total_seconds())
+        video_prefix = f"{base}/zm/index.php?view=view_video&eid="
+        json_prefix  = f"{base}/zm/api/events/"
+        video_suffix = f"&token={token}" if token else ""
+        json_suffix  = f".json?token={token}" if token else ".json"
+
         while True:
             url = (
                 f"{base}/zm/api/events/index"
                 f"/MonitorId:{monitor_id}"
+                f"/EndTime >=:{floor_enc}"
                 f"/StartTime <=:{e_enc}.json"
                 f"?sort=StartTime&direction=asc&limit={int(chunk)}&page={int(page)}"
             )
@@ -1059,13 +1455,13 @@ def events_videos_export(
                 url += f"&token={token}"
 
             try:
-                r = requests.get(url, auth=auth, verify=False, timeout=30)
+                r = _ZM_SESSION.get(url, auth=auth, timeout=30)
                 if debug and debug_level >= 2:
                     logs.append(f"{r.status_code} {url}")
                 if not r.ok:
                     break
 
-                data = r.json() or {}
+                data = _response_json(r) or {}
                 pages_hit += 1
             except Exception as exc:
                 logs.append(f"ERR fetching page {page}: {exc}")
@@ -1082,7 +1478,7 @@ def events_videos_export(
                 if not eid:
                     continue
 
-                ev_start_raw = (ev.get("StartTime") or "").replace("T", " ")
+                ev_start_raw = ev.get("StartTime")
                 if not ev_start_raw:
                     continue
                 ev_start = _parse_dt(ev_start_raw)
@@ -1091,33 +1487,24 @@ def events_videos_export(
                 ev_end_raw = (ev.get("EndTime") or "").strip()
                 if not ev_end_raw:
                     continue  # skip ongoing/null EndTime
-                ev_end = _parse_dt(ev_end_raw.replace("T", " "))
+                ev_end = _parse_dt(ev_end_raw)
 
                 # must overlap buffered window
                 overlaps = (ev_start <= dt_end_adj) and (ev_end >= dt_start_adj)
                 if not overlaps:
                     continue
 
-                # require minimum actual intersection >= buffer seconds (filters tiny edge clips)
-                overlap_start = max(ev_start, dt_start)
-                overlap_end   = min(ev_end, dt_end)
-                overlap_secs  = max(0.0, (overlap_end - overlap_start).total_seconds())
-                if overlap_secs + 1e-6 < float(BUF.total_seconds()):
+                # require minimum actual intersection >= buffer seconds (filters tiny edge clips);
+                # the intersection is also the clip cut for first/last trimming
+                clip_start_dt = ev_start if ev_start > dt_start else dt_start
+                clip_end_dt   = ev_end if ev_end < dt_end else dt_end
+                duration_secs = (clip_end_dt - clip_start_dt).total_seconds()
+                if duration_secs <= 0 or duration_secs + 1e-6 < min_overlap_secs:
                     continue
+                offset_secs   = (clip_start_dt - ev_start).total_seconds()
 
-                video_url = f"{base}/zm/index.php?view=view_video&eid={eid}"
-                json_url  = f"{base}/zm/api/events/{eid}.json"
-                if token:
-                    video_url += f"&token={token}"
-                    json_url  += f"?token={token}"
-
-                # compute clip cut for first/last trimming
-                clip_start_dt = max(ev_start, dt_start)
-                clip_end_dt   = min(ev_end, dt_end)
-                offset_secs   = max(0.0, (clip_start_dt - ev_start).total_seconds())
-                duration_secs = max(0.0, (clip_end_dt - clip_start_dt).total_seconds())
-                if duration_secs <= 0:
-                    continue
+                video_url = f"{video_prefix}{eid}{video_suffix}"
+                json_url  = f"{json_prefix}{eid}{json_suffix}"
 
                 events_out.append({
                     "EventId": eid,
@@ -1169,9 +1556,8 @@ def events_videos_export(
         # save full event list for reference/debug
         fname_json = f"events_m{monitor_id}_{_safe_id(s_in)}_to_{_safe_id(e_in)}.json"
         fpath_json = TEMP_DIR / fname_json
-        fpath_json.write_text(json.dumps({"events": events_out, "count": count}, ensure_ascii=False, indent=2), encoding="utf-8")
-        json_bytes = fpath_json.stat().st_size
-        saved = {"path": str(fpath_json), "bytes": int(json_bytes), "path_url": f"/zm_ai/temp/{fpath_json.name}"}
+        json_bytes = _write_events_json(fpath_json, events_out, count)
+        saved = {"path": str(fpath_json), "bytes": int(json_bytes), "path_url": _TEMP_URL_PREFIX + fpath_json.name}
 
         # ===== SECTION A: Download + optional first/last trim =====
         dl_stats = _download_and_trim(
@@ -1187,11 +1573,14 @@ def events_videos_export(
         if download and concat:
             concat_info = _concat_downloads(
                 TEMP_DIR=TEMP_DIR, monitor_id=monitor_id, s_in=s_in, e_in=e_in,
-                downloaded_now=dl_stats["downloaded_now"],
+                downloaded_now=dl_stats["downloaded_now"], cuts=dl_stats["cuts"],
                 speed=speed, fps=fps, size=size, use_gpu=use_gpu, logs=logs,
                 job_id=job_id,
                 want_concat=want_concat
             )
+            if dl_stats["cuts"] and not concat_info["enabled"] and _FFMPEG is not None:
+                # the cuts were left for the concat list; without a concat output, trim the clips themselves
+                _trim_clips(TEMP_DIR, monitor_id, dl_stats["cuts"], logs)
 
         payload = {
             "monitor_id": monitor_id,
@@ -1229,6 +1618,8 @@ def events_videos_export(
         if job_id:
             try:
                 TEMP_DIR = _default_temp_dir()
+                # the renamed file is never polled again, so its cache entry would leak
+                _COUNTER_CACHE.pop(_counter_paths(job_id, TEMP_DIR)[0], None)
                 (_counter_path(job_id, TEMP_DIR)).replace(
                     TEMP_DIR / f"counter_m{monitor_id}_{_safe_id(s_in)}_to_{_safe_id(e_in)}.json"
                 )
@@ -1238,53 +1629,177 @@ def events_videos_export(
 # =============================================================================
 # PUBLIC: List finished concats (for UI table)
 # =============================================================================
-@router.get("/events/concat_index")
-def events_concat_index():
-    TEMP_DIR = _default_temp_dir()
-    items: List[Dict[str, Any]] = []
-
-    for mp4 in TEMP_DIR.glob("concat_*.mp4"):
-        base = mp4.stem                             # e.g., concat_m3_2025-01-01_to_2025-01-02
-        txt  = mp4.with_suffix(".txt")              # ffmpeg concat list
-        js   = TEMP_DIR / (base.replace("concat_", "events_") + ".json")  # our saved events json (best-effort)
-        log  = TEMP_DIR / (base + ".log")           # if you write concat logs here (optional)
-
-        size_bytes = 0
-        try: size_bytes = mp4.stat().st_size
-        except Exception: pass
+# (path, mtime_ns, size) -> duration seconds (or None) for the concat index
+_DURATION_CACHE: Dict[tuple, Optional[float]] = {}
+_ROW_MTIME = operator.itemgetter(0)
+
+def _set_duration_cache(fresh: Dict[tuple, Optional[float]]) -> None:
+    # swapped whole, so concurrent requests never see a half-updated dict
+    global _DURATION_CACHE
+    _DURATION_CACHE = fresh
+
+def _scan_concat_index(TEMP_DIR: Path) -> List[tuple]:
+    """Rows (mtime, duration-cache key, item) for every concat_*.mp4, durations not filled in."""
+    # One directory pass: bucket the concat outputs and their sidecars by name,
+    # so sidecar existence is a set lookup instead of a stat per file.
+    mp4s: Dict[str, os.DirEntry] = {}
+    txts: set = set()     # ffmpeg concat lists
+    jsons: set = set()    # our saved events json (best-effort)
+    logs: set = set()     # if you write concat logs here (optional)
+    with os.scandir(TEMP_DIR) as it:
+        for entry in it:
+            name = entry.name
+            if name.startswith(_CONCAT_PREFIX):
+                if name.endswith(".mp4"):
+                    mp4s[name[:-4]] = entry
+                elif name.endswith(".txt"):
+                    txts.add(name)
+                elif name.endswith(".log"):
+                    logs.add(name)
+            elif name.startswith(_EVENTS_PREFIX) and name.endswith(".json"):
+                jsons.add(name)
+
+    # plain str names/paths from here on: no PurePath objects per item
+    dir_prefix = os.path.join(str(TEMP_DIR), "")
+    rows: List[tuple] = []  # (mtime, duration-cache key (path, mtime_ns, size), item)
+    for base, entry in mp4s.items():   # base e.g. concat_m3_2025-01-01_to_2025-01-02
+        txt_name = base + ".txt"
+        js_name  = _EVENTS_PREFIX + base[len(_CONCAT_PREFIX):] + ".json"
+        log_name = base + ".log"
+        has_txt = txt_name in txts
+        has_js  = js_name in jsons
+        has_log = log_name in logs
 
-        dur_sec = _ffprobe_duration_seconds(mp4) or None
+        try:
+            st = entry.stat()  # one stat per clip, reused for the sort and duration cache below
+        except OSError:
+            continue  # removed since the directory was listed
 
-        items.append({
+        rows.append((st.st_mtime, (entry.path, st.st_mtime_ns, st.st_size), {
             "base_name": base,
-            "mp4": str(mp4),
-            "list": str(txt) if txt.exists() else None,
-            "list_url": f"/zm_ai/temp/{txt.name}" if txt.exists() else None,
-            "json": str(js) if js.exists() else None,
-            "json_url": f"/zm_ai/temp/{js.name}" if js.exists() else None,  
-            "log":  str(log) if log.exists() else None,
-            "size_bytes": int(size_bytes),
-            "length_sec": float(dur_sec) if dur_sec is not None else None,
+            "mp4": entry.path,
+            "list": dir_prefix + txt_name if has_txt else None,
+            "list_url": _TEMP_URL_PREFIX + txt_name if has_txt else None,
+            "json": dir_prefix + js_name if has_js else None,
+            "json_url": _TEMP_URL_PREFIX + js_name if has_js else None,
+            "log":  dir_prefix + log_name if has_log else None,
+            "size_bytes": st.st_size,
+            "length_sec": None,  # filled in per request from _DURATION_CACHE
             "status": "done",
-        })
+        }))
 
-    # Sort by mtime desc
-    items.sort(key=lambda it: Path(it["mp4"]).stat().st_mtime if it.get("mp4") else 0, reverse=True)
-    return {"items": items}
+    return rows
+
+# Linux: an inotify watch on temp/ marks the last scan stale, so unchanged dirs aren't rescanned
+_INDEX_ROWS: Optional[List[tuple]] = None
+_INDEX_STALE = True
+_INDEX_WATCH: Optional[str] = None  # temp dir being watched, once the watcher is up
+_INDEX_WATCH_LOCK = threading.Lock()
+
+def _watch_concat_index(temp_dir: str, inotify) -> None:
+    global _INDEX_STALE, _INDEX_WATCH
+    try:
+        while True:
+            for event in inotify.read():
+                if event.mask & inotify_flags.IGNORED:
+                    return  # watch gone (temp/ removed or unmounted)
+                if event.name.startswith((_CONCAT_PREFIX, _EVENTS_PREFIX)):
+                    _INDEX_STALE = True
+    except Exception:
+        pass
+    finally:
+        _INDEX_WATCH = None  # the next request rescans and re-arms the watch
+        _INDEX_STALE = True
+        inotify.close()
+
+def _concat_index_rows(TEMP_DIR: Path) -> List[tuple]:
+    global _INDEX_ROWS, _INDEX_STALE, _INDEX_WATCH
+    temp_dir = str(TEMP_DIR)
+    if INotify is not None and _INDEX_WATCH != temp_dir:
+        with _INDEX_WATCH_LOCK:
+            if _INDEX_WATCH != temp_dir:
+                try:
+                    inotify = INotify()
+                    inotify.add_watch(temp_dir, inotify_flags.CREATE | inotify_flags.DELETE
+                                      | inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO
+                                      | inotify_flags.MOVED_FROM)
+                    threading.Thread(target=_watch_concat_index, args=(temp_dir, inotify), daemon=True).start()
+                    _INDEX_WATCH = temp_dir
+                    _INDEX_STALE = True
+                except OSError:
+                    pass
+    rows = _INDEX_ROWS
+    if rows is None or _INDEX_STALE or _INDEX_WATCH != temp_dir:
+        _INDEX_STALE = False  # cleared before scanning: a change during the scan re-marks it
+        rows = _INDEX_ROWS = _scan_concat_index(TEMP_DIR)
+    return list(rows)  # callers sort in place
+
+def _iter_concat_index(limit: Optional[int]):
+    """Concat index items newest first, each yielded as soon as its duration is known."""
+    rows = _concat_index_rows(_default_temp_dir())
+
+    # Sort by mtime desc (only the newest `limit` rows are kept, and probed)
+    cache = _DURATION_CACHE
+    fresh = {key: cache[key] for _, key, _ in rows if key in cache}  # drops files that are gone
+    if limit is not None and limit < len(rows):
+        rows = heapq.nlargest(limit, rows, key=_ROW_MTIME)
+    else:
+        rows.sort(key=_ROW_MTIME, reverse=True)
+
+    # Durations: reuse the cached value while path, mtime and size are unchanged;
+    # probe only new/rewritten files (in parallel, consumed in row order)
+    misses = [key for _, key, _ in rows if key not in fresh]
+    pool = ThreadPoolExecutor(max_workers=min(_PROBE_WORKERS, len(misses))) if misses else None
+    try:
+        probed = pool.map(_ffprobe_duration_seconds, [k[0] for k in misses]) if pool else iter(())
+        for _, key, item in rows:
+            if key not in fresh:
+                fresh[key] = next(probed)
+            item["length_sec"] = fresh[key] or None  # probes return float seconds or None
+            yield item
+        _set_duration_cache(fresh)
+    finally:
+        if pool:
+            pool.shutdown(wait=False, cancel_futures=True)  # client went away mid-stream
+
+@router.get("/events/concat_index")
+def events_concat_index(
+    limit: Optional[int] = Query(None, ge=1, description="Only the newest N concat files"),
+):
+    items = list(_iter_concat_index(limit))
+    # already plain JSON types: encode once, skipping FastAPI's jsonable_encoder walk
+    return Response(_json_dumps({"items": items}), media_type="application/json")
+
+@router.get("/events/concat_index.ndjson")
+def events_concat_index_ndjson(
+    limit: Optional[int] = Query(None, ge=1, description="Only the newest N concat files"),
+):
+    """Same items as /events/concat_index, one JSON object per line, streamed as they are probed."""
+    return StreamingResponse(
+        (_json_dumps(item) + b"\n" for item in _iter_concat_index(limit)),
+        media_type="application/x-ndjson",
+    )
 
 
 # =============================================================================
 # PUBLIC: Delete a concat set (mp4 + sidecars) by base name
 # =============================================================================
+def _try_unlink(p: Path) -> Optional[str]:
+    try:
+        os.unlink(p)  # one syscall; a missing sidecar is just FileNotFoundError
+        return str(p)
+    except OSError:
+        return None
+
 @router.post("/events/files/delete")
-def events_files_delete(base: str = Query(..., description="Base name without extension, e.g., concat_m10_...")):
+async def events_files_delete(base: str = Query(..., description="Base name without extension, e.g., concat_m10_...")):
     TEMP_DIR = _default_temp_dir()
 
-    # sanitize and strip any accidental extension
-    b = _safe_id(base).replace(".mp4", "").replace(".json", "")
-
-    # expect "concat_<suffix>" → extract "<suffix>"
-    suffix = b[len("concat_"):] if b.startswith("concat_") else b
+    # sanitize, then one anchored match: optional "concat_", the <suffix>, optional extension
+    m = _DELETE_BASE_RE.match(_safe_id(base))
+    if not m:
+        raise HTTPException(status_code=400, detail="Bad base name")
+    suffix = m.group("suffix")
 
     targets = [
         TEMP_DIR / f"concat_{suffix}.mp4",
@@ -1292,14 +1807,9 @@ def events_files_delete(base: str = Query(..., description="Base name without ex
         TEMP_DIR / f"events_{suffix}.json",
     ]
 
-    deleted: list[str] = []
-    for p in targets:
-        try:
-            if p.exists():
-                p.unlink()
-                deleted.append(str(p))
-        except Exception:
-            pass
+    # unlinks run side by side off the event loop: latency is the slowest one, not the sum
+    results = await asyncio.gather(*(asyncio.to_thread(_try_unlink, p) for p in targets))
+    deleted: list[str] = [r for r in results if r]
 
     if not deleted:
         raise HTTPException(status_code=404, detail="Nothing deleted")